@@ -0,0 +1,44 @@
+import sys
+from graph_core import random_jobs
+from jobs_schedule import jobs_schedule_numpy, jobs_schedule_ratio
+from time import time
+
+
+def benchmark(weights, lengths, engines):
+    '''
+    INPUT: Numpy Array, Numpy Array, Dictionary
+    OUTPUT: Dictionary
+
+    Run each of the given scheduling engines (a dictionary of names to
+    functions of the weights and lengths) on the same jobs. Return, for each
+    engine, the weighted completion time it found and the time it took (in
+    seconds).
+    '''
+    results = {}
+    for name, engine in engines.items():
+        time_0 = time()
+        total = engine(weights, lengths)
+        time_1 = time()
+        results[name] = (total, time_1 - time_0)
+    return results
+
+
+if __name__ == '__main__':
+    # The number of jobs may be given on the command line.
+    num_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+    weights, lengths = random_jobs(num_jobs)
+    print('Finished Generating {} Jobs\n'.format(num_jobs))
+    engines = {
+        'Float Ratio': lambda weights, lengths:
+            jobs_schedule_numpy(weights, lengths, 1),
+        'Exact Ratio': lambda weights, lengths:
+            jobs_schedule_numpy(weights, lengths, 1, exact=True),
+        # The original path, on a list of tuples, built outside the timing.
+        'Python Ratio': lambda weights, lengths, jobs=list(
+            zip(weights.tolist(), lengths.tolist())):
+            jobs_schedule_ratio(jobs),
+    }
+    results = benchmark(weights, lengths, engines)
+    for name, (total, seconds) in results.items():
+        print('{:<12}\tTotal: {:>22}\tTime: {:>8.3f} Seconds'
+              .format(name, total, seconds))
@@ -1,3 +1,8 @@
+import numpy as np
+import random
+from fractions import Fraction
+
+
 def jobs_schedule(jobs, i):
     '''
     INPUT: List, Int
@@ -54,6 +59,335 @@ def sum_weighted_completion_times(jobs):
     return sum_total
 
 
+def jobs_schedule_numpy(weights, lengths, i, exact=False):
+    '''
+    INPUT: Numpy Array, Numpy Array, Int, Boolean
+    OUTPUT: Int
+
+    Same as jobs_schedule, for arrays of weights and lengths (see read_file),
+    which is much faster for millions of jobs: sort once with np.lexsort (by
+    difference or ratio, then by weight, in decreasing order), then compute
+    the completion times with np.cumsum. Jobs that tie on both keep their
+    order in the input. If exact is True, order by ratio with ratio_order
+    instead, which never lets 2 different ratios tie.
+    '''
+    if i == 0:
+        priorities = weights - lengths
+    elif exact:
+        order = ratio_order(weights, lengths)
+        return weighted_completion_total(weights[order], lengths[order])
+    else:
+        priorities = weights / lengths
+    # np.lexsort sorts by the last key first, in increasing order.
+    order = np.lexsort((-weights, -priorities))
+    return weighted_completion_total(weights[order], lengths[order])
+
+
+def ratio_order(weights, lengths):
+    '''
+    INPUT: Numpy Array, Numpy Array
+    OUTPUT: Numpy Array
+
+    Return the order of the jobs by exact ratio (w1 / l1 before w2 / l2 if
+    w1 * l2 > w2 * l1), decreasing, then by position in the input. Jobs with
+    equal ratios can be swapped without changing the weighted completion
+    time, so the total is the same as for any other exact order, bit for bit.
+
+    A single stable sort by float ratio is used, which is much faster than
+    np.lexsort with a second key. Float division is correctly rounded, hence
+    monotone: if one ratio is larger than another, its float is larger or
+    equal. So sorting by float ratio is exact, except within runs of equal
+    floats, which may hide different ratios once weights and lengths are
+    large. Adjacent jobs in such runs are checked by cross-multiplication, and
+    only the runs that do hide different ratios are re-sorted, with exact
+    Python fractions. Weights or lengths above 2 ** 53 are not exact as
+    floats, so all of the jobs are sorted with fractions instead.
+    '''
+    if len(weights) and max(int(weights.max()), int(lengths.max())) > 2 ** 53:
+        return np.array(exact_ratio_sort(range(len(weights)), weights,
+                                         lengths), dtype=np.int64)
+    order = np.argsort(-(weights / lengths), kind='stable')
+    ws, ls = weights[order], lengths[order]
+    ratios = ws / ls
+    same_float = ratios[:-1] == ratios[1:]
+    if not same_float.any():
+        return order
+    # The products fit in an int64 unless weights and lengths are huge.
+    if int(ws.max()) * int(ls.max()) >= 2 ** 63:
+        ws, ls = ws.astype(object), ls.astype(object)
+    different = np.flatnonzero(same_float &
+                               (ws[:-1] * ls[1:] != ws[1:] * ls[:-1]))
+    if not len(different):
+        return order
+    starts = np.flatnonzero(np.concatenate(([True], ~same_float)))
+    stops = np.append(starts[1:], len(order))
+    runs = np.unique(np.searchsorted(starts, different, side='right') - 1)
+    for start, stop in zip(starts[runs].tolist(), stops[runs].tolist()):
+        order[start:stop] = exact_ratio_sort(order[start:stop].tolist(),
+                                             weights, lengths)
+    return order
+
+
+def exact_ratio_sort(jobs, weights, lengths):
+    '''
+    INPUT: Iterable, Numpy Array, Numpy Array
+    OUTPUT: List
+
+    Sort the given jobs (indices into the weights and lengths) with
+    exact_ratio_key. The sort is stable, so ties keep their order.
+    '''
+    return sorted(jobs, key=lambda job: exact_ratio_key(int(weights[job]),
+                                                        int(lengths[job])))
+
+
+def weighted_completion_total(weights, lengths):
+    '''
+    INPUT: Numpy Array, Numpy Array
+    OUTPUT: Int
+
+    Vectorized sum_weighted_completion_times, for jobs already in order. The
+    total is at most sum(weights) * sum(lengths): if that fits in an int64, so
+    does every partial sum; otherwise, sum exactly with Python integers. The
+    bound is estimated with floats, leaving a margin for their rounding.
+    '''
+    bound = weights.sum(dtype=np.float64) * lengths.sum(dtype=np.float64)
+    if bound < 2 ** 62:
+        return int(np.dot(weights, np.cumsum(lengths)))
+    weights, lengths = weights.astype(object), lengths.astype(object)
+    return int(np.dot(weights, np.cumsum(lengths)))
+
+
+def difference_key(weight, length):
+    '''
+    INPUT: Int, Int
+    OUTPUT: Tuple
+
+    Sort key of a job for JobScheduler, in the same order as
+    jobs_schedule_difference: by difference, then weight, decreasing.
+    '''
+    return length - weight, -weight
+
+
+def ratio_key(weight, length):
+    '''
+    INPUT: Int, Int
+    OUTPUT: Float
+
+    Sort key of a job for JobScheduler, in the same order as
+    jobs_schedule_ratio: by ratio, decreasing.
+    '''
+    return -weight / length
+
+
+def exact_ratio_key(weight, length):
+    '''
+    INPUT: Int, Int
+    OUTPUT: Fraction
+
+    Sort key of a job for JobScheduler, in the same order as ratio_order: by
+    exact ratio, decreasing. Ties are broken by ID, as for every key (see
+    JobScheduler.new_node).
+    '''
+    return Fraction(-weight, length)
+
+
+class JobScheduler(object):
+    '''
+    Schedule of jobs that are added and removed over time, kept sorted by the
+    given key (see difference_key and ratio_key), with its weighted completion
+    time updated after every change rather than recomputed. The jobs are kept
+    in a treap (a binary search tree, balanced by random priorities) in which
+    each node also holds the total weight and length of its subtree. Adding a
+    job of weight w and length l to the schedule adds w * (L + l) + l * W to
+    the total, where L is the total length of the jobs before it, and W the
+    total weight of the jobs after it. Splitting the treap at the job's key
+    yields both, so adding or removing a job takes O(log n) expected time.
+    '''
+
+    def __init__(self, key=difference_key):
+        '''
+        INPUT: Function
+        OUTPUT: None
+        '''
+        self.key = key
+        self.total = 0
+        self.root = -1
+        self.size = 0
+        # Treap nodes, by job ID; IDs of removed jobs (whose keys are None)
+        # are reused.
+        self.keys, self.priorities = [], []
+        self.left, self.right = [], []
+        self.weights, self.lengths = [], []
+        self.weight_sums, self.length_sums = [], []
+        self.free = []
+
+    def __len__(self):
+        return self.size
+
+    def add(self, weight, length):
+        '''
+        INPUT: Int, Int
+        OUTPUT: Int
+
+        Add a job to the schedule, and return its ID.
+        '''
+        job = self.new_node(weight, length)
+        before, after = self.split(self.root, self.keys[job])
+        self.total += weight * (self.length_sum(before) + length) + \
+            length * self.weight_sum(after)
+        self.root = self.merge(self.merge(before, job), after)
+        self.size += 1
+        return job
+
+    def remove(self, job):
+        '''
+        INPUT: Int
+        OUTPUT: None
+
+        Remove the job with the given ID from the schedule. Raise a KeyError
+        if no job in the schedule has that ID (e.g. it was already removed, as
+        IDs are reused).
+        '''
+        if not 0 <= job < len(self.keys) or self.keys[job] is None:
+            raise KeyError(job)
+        before, after = self.split(self.root, self.keys[job])
+        # The job is the first node of the second half.
+        after = self.remove_first(after)
+        weight, length = self.weights[job], self.lengths[job]
+        self.total -= weight * (self.length_sum(before) + length) + \
+            length * self.weight_sum(after)
+        self.root = self.merge(before, after)
+        self.size -= 1
+        self.keys[job] = None
+        self.free.append(job)
+
+    def schedule(self):
+        '''
+        INPUT: None
+        OUTPUT: List
+
+        Return the jobs in order, as (weight, length) tuples.
+        '''
+        jobs, stack, node = [], [], self.root
+        while stack or node >= 0:
+            while node >= 0:
+                stack.append(node)
+                node = self.left[node]
+            node = stack.pop()
+            jobs.append((self.weights[node], self.lengths[node]))
+            node = self.right[node]
+        return jobs
+
+    def new_node(self, weight, length):
+        '''
+        INPUT: Int, Int
+        OUTPUT: Int
+
+        Create a treap node for the job, and return its ID. Ties between keys
+        are broken by ID, so that every key is unique.
+        '''
+        values = [None, random.random(), -1, -1, weight, length, weight,
+                  length]
+        fields = [self.keys, self.priorities, self.left, self.right,
+                  self.weights, self.lengths, self.weight_sums,
+                  self.length_sums]
+        if self.free:
+            job = self.free.pop()
+            for field, value in zip(fields, values):
+                field[job] = value
+        else:
+            job = len(self.keys)
+            for field, value in zip(fields, values):
+                field.append(value)
+        self.keys[job] = (self.key(weight, length), job)
+        return job
+
+    def weight_sum(self, node):
+        return self.weight_sums[node] if node >= 0 else 0
+
+    def length_sum(self, node):
+        return self.length_sums[node] if node >= 0 else 0
+
+    def update(self, node):
+        '''
+        INPUT: Int
+        OUTPUT: None
+
+        Recompute the subtree sums of the node, from its children.
+        '''
+        left, right = self.left[node], self.right[node]
+        self.weight_sums[node] = self.weights[node] + \
+            self.weight_sum(left) + self.weight_sum(right)
+        self.length_sums[node] = self.lengths[node] + \
+            self.length_sum(left) + self.length_sum(right)
+
+    def split(self, node, key):
+        '''
+        INPUT: Int, Tuple
+        OUTPUT: Int, Int
+
+        Split the subtree of the node into 2 treaps: the nodes with keys less
+        than the given key, and the rest. Return their roots (-1 if empty).
+        '''
+        if node < 0:
+            return -1, -1
+        if self.keys[node] < key:
+            less, rest = self.split(self.right[node], key)
+            self.right[node] = less
+            self.update(node)
+            return node, rest
+        less, rest = self.split(self.left[node], key)
+        self.left[node] = rest
+        self.update(node)
+        return less, node
+
+    def merge(self, first, second):
+        '''
+        INPUT: Int, Int
+        OUTPUT: Int
+
+        Merge 2 treaps, where every key of the first is less than every key of
+        the second, and return the root of the result.
+        '''
+        if first < 0:
+            return second
+        if second < 0:
+            return first
+        if self.priorities[first] > self.priorities[second]:
+            self.right[first] = self.merge(self.right[first], second)
+            self.update(first)
+            return first
+        self.left[second] = self.merge(first, self.left[second])
+        self.update(second)
+        return second
+
+    def remove_first(self, node):
+        '''
+        INPUT: Int
+        OUTPUT: Int
+
+        Remove the node with the smallest key from the treap, and return the
+        new root.
+        '''
+        if self.left[node] < 0:
+            return self.right[node]
+        self.left[node] = self.remove_first(self.left[node])
+        self.update(node)
+        return node
+
+
+def read_file(filename):
+    '''
+    INPUT: String
+    OUTPUT: Numpy Array, Numpy Array
+
+    Read a jobs file (the number of jobs, then a weight and length per line)
+    at once with np.loadtxt. Return the weights and lengths, as int64 arrays.
+    '''
+    jobs = np.loadtxt(filename, dtype=np.int64, skiprows=1, ndmin=2)
+    return jobs[:, 0].copy(), jobs[:, 1].copy()
+
+
 if __name__ == '__main__':
     with open('jobs.txt') as f:
         # The first line of the file contains the number of jobs; keep or skip.
@@ -1,5 +1,14 @@
-import networkx as nx
 import heapq
+import numpy as np
+from graph_core import IndexedHeap, UnionFind, read_edges
+
+# Kruskal's algorithm sorts all of the edges at once, with NumPy, but then
+# scans them in Python, with a union-find per edge. Prim's algorithm does n
+# pops and up to m decrease-keys, O(m log n) in all, but on a dense graph most
+# edges only cost a comparison, as few are cheaper than the neighbor's key.
+# Above this edge density (m / (n * (n - 1))), Prim's algorithm is the faster
+# of the 2.
+MAX_KRUSKAL_DENSITY = 0.1
 
 
 def prim_algorithm(graph, start):
@@ -14,15 +23,15 @@ def prim_algorithm(graph, start):
     cost = 0
     heap = []
     # Set the start node to 'explored', and push its neighbors to the heap.
-    graph.node[start]['explored'] = True
+    graph.nodes[start]['explored'] = True
     graph, heap = push_heap(graph, heap, start)
     # The min-heap is ordered by the weights between 2 nodes of the graph.
     while heap:
         # Pop from heap to return the node-pair with the smallest weight.
         weight, (node1, node2) = heapq.heappop(heap)
         # First node has been explored, but second node may not have been.
-        if not graph.node[node2]['explored']:
-            graph.node[node2]['explored'] = True
+        if not graph.nodes[node2]['explored']:
+            graph.nodes[node2]['explored'] = True
             cost += weight
             graph, heap = push_heap(graph, heap, node2)
     return cost
@@ -37,22 +46,104 @@ def push_heap(graph, heap, node):
     '''
     for neighbor in graph[node]:
         # If a neighbor hasn't been explored, add the nodes and the weight.
-        if not graph.node[neighbor]['explored']:
+        if not graph.nodes[neighbor]['explored']:
             heapq.heappush(heap,
                            (graph[node][neighbor]['weight'], (node, neighbor)))
     return graph, heap
 
 
+def minimum_spanning_forest(graph, method=None):
+    '''
+    INPUT: CSRGraph, String
+    OUTPUT: Number, List
+
+    Find the minimum spanning forest (a minimum spanning tree of each connected
+    component) of a weighted, undirected graph, given as a CSRGraph with every
+    edge in both directions. The method is 'prim' or 'kruskal'; by default,
+    Prim's algorithm is used for dense graphs, and Kruskal's for sparse ones.
+    Return the cost of the forest, and its edges as (node1, node2, weight).
+    '''
+    if method is None:
+        n = graph.num_nodes
+        density = graph.num_edges / max(n * (n - 1), 1)
+        method = 'prim' if density > MAX_KRUSKAL_DENSITY else 'kruskal'
+    if method == 'prim':
+        edges = prim_forest(graph)
+    else:
+        edges = kruskal_forest(graph)
+    return sum(weight for node1, node2, weight in edges), edges
+
+
+def prim_forest(graph):
+    '''
+    INPUT: CSRGraph
+    OUTPUT: List
+
+    Prim's algorithm with an indexed min-heap: each node outside of the tree is
+    in the heap at most once, keyed by its cheapest edge to the tree, and that
+    key is decreased as cheaper edges are found. Once the heap is empty, start
+    again from any node not yet reached, until every component is spanned.
+    Return the edges of the forest, as (node1, node2, weight).
+    '''
+    n = graph.num_nodes
+    offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+    weights = graph.weights.tolist()
+    explored = [False] * n
+    # Tree node at the other end of each node's cheapest edge to the tree.
+    parents = [-1] * n
+    heap = IndexedHeap(n)
+    edges = []
+    for root in range(n):
+        if explored[root]:
+            continue
+        heap.push(root, 0)
+        while heap:
+            node, weight = heap.pop()
+            explored[node] = True
+            if parents[node] >= 0:
+                edges.append((parents[node], node, weight))
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[edge]
+                if not explored[neighbor] and (
+                        neighbor not in heap or
+                        weights[edge] < heap.keys[neighbor]):
+                    parents[neighbor] = node
+                    heap.push(neighbor, weights[edge])
+    return edges
+
+
+def kruskal_forest(graph):
+    '''
+    INPUT: CSRGraph
+    OUTPUT: List
+
+    Kruskal's algorithm: sort the edges by weight (with NumPy), then add each
+    edge that joins 2 different trees, according to an array-backed UnionFind.
+    Stop as soon as the forest has n - 1 edges. Return the edges of the forest,
+    as (node1, node2, weight).
+    '''
+    n = graph.num_nodes
+    tails, heads, weights = graph.tails(), graph.targets, graph.weights
+    # Each undirected edge is stored in both directions; only keep one.
+    once = tails < heads
+    tails, heads, weights = tails[once], heads[once], weights[once]
+    order = np.argsort(weights, kind='stable')
+    unionfind = UnionFind(n)
+    edges = []
+    for node1, node2, weight in zip(tails[order].tolist(),
+                                    heads[order].tolist(),
+                                    weights[order].tolist()):
+        if unionfind.union(node1, node2):
+            edges.append((node1, node2, weight))
+            if len(edges) == n - 1:
+                break
+    return edges
+
+
 if __name__ == '__main__':
-    graph = nx.Graph()
-    with open('edges.txt') as f:
-        num_nodes, num_edges = map(int, f.readline().split())
-        for line in f:
-            node1, node2, weight = map(int, line.split())
-            graph.add_edge(node1, node2, weight=weight)
-    nx.set_node_attributes(graph, 'explored', False)
-
-    start = 1
-    print('Minimum Spanning Tree (Weight):\t{}'
-          .format(prim_algorithm(graph, start)))
+    # Each (undirected) edge is read once, then stored in both directions.
+    graph = read_edges('edges.txt').undirected()
+
+    cost, edges = minimum_spanning_forest(graph)
+    print('Minimum Spanning Tree (Weight):\t{}'.format(cost))
     # Answer = -3612829
@@ -0,0 +1,44 @@
+from hamming_clustering import (hamming_clustering, hamming_clustering_numpy,
+                                read_file)
+from time import time
+import tracemalloc
+
+
+def benchmark(nodes, num_bits, min_distance, engines):
+    '''
+    INPUT: Counter, Int, Int, Dictionary
+    OUTPUT: Dictionary
+
+    Run each of the given clustering engines (a dictionary of names to
+    functions with the same arguments as hamming_clustering) on the same
+    nodes. Return, for each engine, the number of clusters it found, the time
+    it took (in seconds), and the peak memory it allocated (in bytes).
+    '''
+    results = {}
+    for name, engine in engines.items():
+        tracemalloc.start()
+        time_0 = time()
+        num_clusters = engine(nodes, num_bits, min_distance)
+        time_1 = time()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = (num_clusters, time_1 - time_0, peak)
+    return results
+
+
+if __name__ == '__main__':
+    nodes, num_bits = read_file('clustering_big.txt')
+    min_distance = 3
+    engines = {
+        'Pair Set': hamming_clustering,
+        'XOR Masks': lambda nodes, num_bits, min_distance:
+            hamming_clustering_numpy(nodes, num_bits, min_distance, 'masks'),
+        'Bit Blocks': lambda nodes, num_bits, min_distance:
+            hamming_clustering_numpy(nodes, num_bits, min_distance, 'blocks'),
+    }
+    results = benchmark(nodes, num_bits, min_distance, engines)
+    for name, (num_clusters, seconds, peak) in results.items():
+        print('{:<12}\tClusters: {:>6}\tTime: {:>8.3f} Seconds\t'
+              'Peak Memory: {:>8.1f} MB'
+              .format(name, num_clusters, seconds, peak / 2 ** 20))
+    # Answer = 6118
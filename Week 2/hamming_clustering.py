@@ -1,6 +1,16 @@
-import networkx as nx
+import numpy as np
 from collections import Counter
 from itertools import combinations
+from math import comb
+from graph_core import UnionFind
+
+# Above this many XOR masks, hamming_clustering_numpy switches from probing
+# every mask to comparing the nodes that share a block of bits (pigeonhole).
+MAX_MASKS = 1000
+
+# Number of bits set in each possible byte, for counting the bits of labels.
+BYTE_POPCOUNTS = np.array([bin(byte).count('1') for byte in range(256)],
+                          dtype=np.uint8)
 
 
 def hamming_clustering(nodes, num_bits, min_distance):
@@ -11,14 +21,111 @@ def hamming_clustering(nodes, num_bits, min_distance):
     Return the number of clusters such that the distance between any 2 nodes
     that are in different clusters is at least the given Hamming distance.
     '''
-    num_clusters = len(nodes)
-    unionfind = nx.utils.UnionFind()
+    # The UnionFind is over 0 to n - 1, so number the (distinct) nodes first.
+    index = {node: i for i, node in enumerate(nodes)}
+    unionfind = UnionFind(len(index))
+    for distance in range(1, min_distance):
+        pairs = distance_pairs(nodes, num_bits, distance)
+        unionfind.union_many((index[node1], index[node2])
+                             for node1, node2 in pairs)
+    return unionfind.components
+
+
+def hamming_clustering_numpy(nodes, num_bits, min_distance, method=None):
+    '''
+    INPUT: Counter, Int, Int, String
+    OUTPUT: Int
+
+    Streaming, vectorized version of hamming_clustering: rather than building
+    the set of all pairs of close nodes first, merge the pairs found by each
+    vectorized probe straight away. Nodes may have up to 64 bits. The method
+    is either 'masks' (see mask_pairs) or 'blocks' (see block_pairs); by
+    default, 'masks' is used unless it would need more than MAX_MASKS masks.
+    '''
+    labels = np.array(sorted(nodes), dtype=np.uint64)
+    unionfind = UnionFind(len(labels))
+    if method is None:
+        num_masks = sum(comb(num_bits, distance)
+                        for distance in range(1, min_distance))
+        method = 'masks' if num_masks <= MAX_MASKS else 'blocks'
+    if method == 'masks':
+        batches = mask_pairs(labels, num_bits, min_distance)
+    else:
+        batches = block_pairs(labels, num_bits, min_distance)
+    for node1, node2 in batches:
+        unionfind.union_many(zip(node1.tolist(), node2.tolist()))
+    return unionfind.components
+
+
+def mask_pairs(labels, num_bits, min_distance):
+    '''
+    INPUT: Numpy Array, Int, Int
+    OUTPUT: Generator
+
+    For each XOR mask with fewer than min_distance bits set, look up every
+    (sorted, unique) label XOR the mask in the labels at once, with a binary
+    search. Yield the indices of the pairs of labels found, one mask at a time.
+    '''
+    indices = np.arange(len(labels))
     for distance in range(1, min_distance):
-        for node1, node2 in distance_pairs(nodes, num_bits, distance):
-            if unionfind[node1] != unionfind[node2]:
-                unionfind.union(node1, node2)
-                num_clusters -= 1
-    return num_clusters
+        for mask in distance_permutations(num_bits, distance):
+            probes = labels ^ np.uint64(mask)
+            positions = np.searchsorted(labels, probes)
+            positions[positions == len(labels)] = 0
+            # Only keep each pair once, from its smaller label.
+            found = (labels[positions] == probes) & (indices < positions)
+            yield indices[found], positions[found]
+
+
+def block_pairs(labels, num_bits, min_distance):
+    '''
+    INPUT: Numpy Array, Int, Int
+    OUTPUT: Generator
+
+    Split the bits into min_distance blocks. By the pigeonhole principle, 2
+    labels that differ in fewer than min_distance bits agree on at least one
+    whole block. So, for each block, sort the labels by that block's bits, and
+    compare each label to the ones after it with the same block bits, one
+    offset at a time (all labels at once). Yield the indices of the pairs of
+    labels that differ in fewer than min_distance bits, one batch at a time.
+
+    With more blocks than bits, some blocks would be empty and every label
+    would match; but then every pair of labels is close anyway, so a single
+    chain of consecutive labels, which joins them all, is yielded instead.
+    '''
+    if min_distance > num_bits:
+        indices = np.arange(len(labels))
+        yield indices[:-1], indices[1:]
+        return
+    bounds = np.linspace(0, num_bits, min_distance + 1).astype(int)
+    for low, high in zip(bounds[:-1], bounds[1:]):
+        block_mask = np.uint64((1 << int(high - low)) - 1)
+        keys = (labels >> np.uint64(low)) & block_mask
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        offset = 1
+        # Labels with the same key are adjacent, so stop at the first offset
+        # with no matching keys: there cannot be any further along either.
+        while offset < len(labels):
+            same = keys[:-offset] == keys[offset:]
+            if not same.any():
+                break
+            node1, node2 = order[:-offset][same], order[offset:][same]
+            close = popcount(labels[node1] ^ labels[node2]) < min_distance
+            yield node1[close], node2[close]
+            offset += 1
+
+
+def popcount(values):
+    '''
+    INPUT: Numpy Array
+    OUTPUT: Numpy Array
+
+    Return the number of bits set in each of the (64-bit) values, by looking up
+    the number of bits set in each of their 8 bytes.
+    '''
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return BYTE_POPCOUNTS[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
 
 
 def distance_pairs(nodes, num_bits, distance):
@@ -61,13 +168,27 @@ def distance_permutations(num_bits, distance):
     return distances
 
 
-if __name__ == '__main__':
+def read_file(filename):
+    '''
+    INPUT: String
+    OUTPUT: Counter, Int
+
+    Read the given file. The first line contains the number of nodes and the
+    number of bits of each node's label. Each subsequent line contains a
+    node's label, as bits separated by spaces. Return a Counter of the labels
+    (as base-10 ints), and the number of bits.
+    '''
     nodes = Counter()
-    with open('clustering_big.txt') as f:
+    with open(filename) as f:
         num_nodes, num_bits = map(int, f.readline().split())
         for line in f:
             # Convert the given binary string to a base-10 int before saving.
             nodes[int(line.replace(' ', ''), 2)] += 1
+    return nodes, num_bits
+
+
+if __name__ == '__main__':
+    nodes, num_bits = read_file('clustering_big.txt')
 
     min_distance = 3
     num_clusters = hamming_clustering(nodes, num_bits, min_distance)
@@ -1,4 +1,6 @@
-import networkx as nx
+import heapq
+import numpy as np
+from graph_core import UnionFind
 
 
 def k_clustering(k, distances, n):
@@ -8,28 +10,122 @@ def k_clustering(k, distances, n):
 
     Given a number of clusters, find the minimum distance between the clusters.
     '''
-    # Use the UnionFind data structure provided by the NetworkX graph module.
-    unionfind = nx.utils.UnionFind()
+    # Use an array-backed UnionFind, over the (0-indexed) nodes 1 to n.
+    unionfind = UnionFind(n)
     # Sort the list of distances and their corresponding nodes, by distance.
     distances = sorted(distances, key=lambda x: x[0])
     i = 0
-    while n >= k:
+    while unionfind.components >= k:
         distance, (node1, node2) = distances[i]
         i += 1
-        if unionfind[node1] != unionfind[node2]:
-            unionfind.union(node1, node2)
-            n -= 1
+        unionfind.union(node1 - 1, node2 - 1)
     return distance
 
 
-if __name__ == '__main__':
+def k_clustering_heap(k, distances, n):
+    '''
+    INPUT: Int, List, Int
+    OUTPUT: Int
+
+    Same as k_clustering, but rather than sorting the whole list of distances,
+    turn it into a min-heap in linear time, and only pop the edges needed until
+    the number of clusters drops below k.
+    '''
+    unionfind = UnionFind(n)
+    heap = list(distances)
+    heapq.heapify(heap)
+    while unionfind.components >= k:
+        distance, (node1, node2) = heapq.heappop(heap)
+        unionfind.union(node1 - 1, node2 - 1)
+    return distance
+
+
+def k_clustering_points(k, points):
+    '''
+    INPUT: Int, Numpy Array
+    OUTPUT: Float
+
+    Given a number of clusters, find the minimum distance between the clusters
+    of points (one per row), under the Euclidean distance. The complete graph
+    of distances is never built: see k_clustering_dense. Squared distances
+    give the same MST, so the square root is only taken of the spacing.
+    '''
+    # One contiguous array per coordinate is faster to gather from than rows.
+    coordinates = np.asarray(points, dtype=float).T.copy()
+
+    def squared_distances(node, nodes):
+        '''
+        INPUT: Int, Numpy Array
+        OUTPUT: Numpy Array
+
+        Return the squared distances from the point of the node to the points
+        of each of the given nodes.
+        '''
+        total = np.zeros(len(nodes))
+        for coordinate in coordinates:
+            difference = coordinate[nodes] - coordinate[node]
+            difference *= difference
+            total += difference
+        return total
+    return float(np.sqrt(k_clustering_dense(k, squared_distances,
+                                            len(points))))
+
+
+def k_clustering_dense(k, distances, n):
+    '''
+    INPUT: Int, Function, Int
+    OUTPUT: Number
+
+    Given a number of clusters, find the minimum distance between the clusters
+    of a complete graph of n nodes, where distances(node, nodes) returns the
+    array of distances from the node to each of the given (array of) nodes.
+    Kruskal's algorithm, stopped at k clusters, builds part of an MST (minimum
+    spanning tree), so the spacing is the (k - 1)th heaviest edge of the MST.
+    Build the MST with Prim's algorithm over the dense graph instead, in
+    O(n ** 2) time and O(n) memory. Raise a ValueError unless 2 <= k <= n.
+    '''
+    if not 2 <= k <= n:
+        raise ValueError('Cannot split {} nodes into {} clusters'
+                         .format(n, k))
+    # Nodes not yet in the tree, and their distance to the closest tree node.
+    remaining = np.arange(1, n)
+    closest = np.asarray(distances(0, remaining), dtype=float)
+    edges = np.empty(n - 1)
+    for i in range(n - 1):
+        best = int(np.argmin(closest))
+        node, edges[i] = remaining[best], closest[best]
+        # Remove the node, by moving the last remaining node into its place.
+        last = len(remaining) - 1
+        remaining[best], closest[best] = remaining[last], closest[last]
+        remaining, closest = remaining[:last], closest[:last]
+        if last:
+            np.minimum(closest, distances(node, remaining), out=closest)
+    # Cutting the (k - 1) heaviest edges of the MST leaves k clusters, so the
+    # spacing is the (n - k)th lightest of its (n - 1) edges, counting from 0.
+    return np.partition(edges, n - k)[n - k]
+
+
+def read_file(filename):
+    '''
+    INPUT: String
+    OUTPUT: List, Int
+
+    Read the given file. The first line contains the number of nodes, which is
+    also the initial number of clusters. Each subsequent line contains an edge
+    (2 nodes, 1-indexed) and its distance. Return the edges, as a list of
+    (distance, (node1, node2)) tuples, and the number of nodes.
+    '''
     distances = []
-    with open('clustering1.txt') as f:
-        # First line is number of nodes; also the initial number of clusters.
+    with open(filename) as f:
         n = int(f.readline())
         for line in f:
             node1, node2, distance = map(int, line.split())
             distances.append((distance, (node1, node2)))
+    return distances, n
+
+
+if __name__ == '__main__':
+    distances, n = read_file('clustering1.txt')
 
     k = 4
     min_distance = k_clustering(k, distances, n)
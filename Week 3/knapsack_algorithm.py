@@ -1,21 +1,33 @@
+import numpy as np
+from bisect import bisect_right
+from fractions import Fraction
 from time import time
+from instrumentation import ConsoleLog
 
+# NumPy updates about a billion table cells in a couple of seconds; beyond
+# that (or beyond a gigabyte of rows), knapsack_dispatch uses branch and bound.
+MAX_TABLE_CELLS = 10 ** 9
+MAX_TABLE_BYTES = 2 ** 30
 
-def knapsack_algorithm(items, size):
+
+def knapsack_algorithm(items, size, observer=None):
     '''
-    INPUT: List, Int
+    INPUT: List, Int, Observer
     OUTPUT: Int
 
     Solve the knapsack problem iteratively, rather than recursively, as Python
     doesn't deal well with deep recursion. Use two lists rather than a matrix
     to keep track of the knapsack and its items, to save on space. With each
     additional item seen, it only matters what the knapsack previously held.
+    If an observer is given, report the progress after each item.
     '''
     knapsack_1 = [0] * (size + 1)
     knapsack_2 = [0] * (size + 1)
+    if observer is not None:
+        observer.phase_start('knapsack')
     for i, (value, weight) in enumerate(items):
-        if not (i + 1) % 100:
-            print('Iteration {:4}'.format(i + 1))
+        if observer is not None:
+            observer.progress('knapsack', i, len(items), states=i * (size + 1))
         for s in range(size + 1):
             if (s - weight) < 0:
                 knapsack_2[s] = knapsack_1[s]
@@ -26,9 +38,339 @@ def knapsack_algorithm(items, size):
                     knapsack_2[s] = knapsack_1[s - weight] + value
         # Swap the 2 lists. The 'after' knapsack is now the 'before' knapsack.
         knapsack_1, knapsack_2 = knapsack_2, knapsack_1
+    if observer is not None:
+        observer.progress('knapsack', len(items), len(items),
+                          states=len(items) * (size + 1))
+        observer.phase_end('knapsack', engine='python',
+                           states=len(items) * (size + 1))
     return knapsack_1[size]
 
 
+def knapsack_numpy(items, size, chunk_size=None, observer=None):
+    '''
+    INPUT: List, Int, Int, Observer
+    OUTPUT: Int
+
+    Solve the knapsack problem with NumPy, computing each item's row with a
+    single shifted element-wise maximum rather than a Python loop over every
+    capacity. If a chunk size is given, the capacity axis is processed in
+    blocks of that many cells, which bounds the scratch buffer; otherwise the
+    whole row is updated at once.
+    '''
+    return int(knapsack_row(items, size, chunk_size, observer)[size])
+
+
+def knapsack_row(items, size, chunk_size=None, observer=None):
+    '''
+    INPUT: List, Int, Int, Observer
+    OUTPUT: Numpy Array
+
+    Return the maximum value for every capacity from 0 up to the given size.
+    Only one int64 row is kept, updated in place from the largest capacity
+    downwards, so that the cells read (s - weight) still hold the values from
+    before the current item. A scratch buffer of (at most) the chunk size holds
+    the shifted row, so no other memory is allocated once the loop starts.
+    If an observer is given, report the progress after each item.
+    '''
+    if chunk_size is None:
+        chunk_size = size + 1
+    knapsack = np.zeros(size + 1, dtype=np.int64)
+    # Scratch buffer for the shifted row, allocated once and reused per item.
+    shifted = np.empty(min(chunk_size, size + 1), dtype=np.int64)
+    if observer is not None:
+        observer.phase_start('knapsack',
+                             bytes=knapsack.nbytes + shifted.nbytes)
+    for i, (value, weight) in enumerate(items):
+        if observer is not None:
+            observer.progress('knapsack', i, len(items), states=i * (size + 1))
+        # Capacities below the item's weight keep their previous values.
+        high = size + 1
+        while high > weight:
+            low = max(weight, high - chunk_size)
+            buffer = shifted[:high - low]
+            # knapsack[s] = max(knapsack[s], knapsack[s - weight] + value)
+            np.add(knapsack[low - weight:high - weight], value, out=buffer)
+            np.maximum(knapsack[low:high], buffer, out=knapsack[low:high])
+            high = low
+    if observer is not None:
+        observer.progress('knapsack', len(items), len(items),
+                          states=len(items) * (size + 1))
+        observer.phase_end('knapsack', engine='numpy',
+                           states=len(items) * (size + 1))
+    return knapsack
+
+
+def knapsack_items(items, size, observer=None):
+    '''
+    INPUT: List, Int, Observer
+    OUTPUT: Int, List
+
+    Solve the knapsack problem and also return the (0-based) indices of the
+    chosen items, without keeping the full n x size matrix of decisions. Use
+    a divide-and-conquer (Hirschberg-style) recomputation instead: split the
+    items in half, compute the rows of both halves, and find the capacity at
+    which to split the knapsack between them. Then recurse on each half. Only
+    two rows are alive at a time, and the total work is at most twice that of
+    computing the value alone. Return the maximum value and the item indices.
+    If an observer is given, report the progress each time an item is decided
+    (and the table cells updated so far), within a single phase.
+    '''
+    chosen = []
+    decided = states = 0
+    if observer is not None:
+        observer.phase_start('knapsack')
+    # Use an explicit stack of (first item, last item, capacity) subproblems.
+    stack = [(0, len(items), size)]
+    while stack:
+        start, end, capacity = stack.pop()
+        if end - start == 1:
+            value, weight = items[start]
+            if weight <= capacity and value > 0:
+                chosen.append(start)
+            decided += 1
+            if observer is not None:
+                observer.progress('knapsack', decided, len(items),
+                                  states=states)
+        elif end > start:
+            middle = (start + end) // 2
+            before = knapsack_row(items[start:middle], capacity)
+            after = knapsack_row(items[middle:end], capacity)
+            states += (end - start) * (capacity + 1)
+            # Give s to the first half, and (capacity - s) to the second half.
+            split = int(np.argmax(before + after[::-1]))
+            # Free both rows before computing the rows of the next subproblem.
+            del before, after
+            stack.append((start, middle, split))
+            stack.append((middle, end, capacity - split))
+    if observer is not None:
+        observer.phase_end('knapsack', engine='items', states=states)
+    chosen.sort()
+    return sum(items[i][0] for i in chosen), chosen
+
+
+def knapsack_sparse(items, size, observer=None):
+    '''
+    INPUT: List, Int, Observer
+    OUTPUT: Int, Int
+
+    Solve the knapsack problem by tracking only the breakpoints of the optimal
+    value as a function of capacity: the (weight, value) pairs where the value
+    strictly increases, i.e. the Pareto frontier of the items seen so far. For
+    each additional item, shift the frontier by the item's weight and value,
+    merge it with the old frontier, and drop the dominated pairs (those with a
+    heavier weight but no greater value). Return the maximum value, as well as
+    the number of states (frontier pairs) that were generated along the way.
+    If an observer is given, report the progress (and states) after each item.
+    '''
+    weights = np.zeros(1, dtype=np.int64)
+    values = np.zeros(1, dtype=np.int64)
+    states = 1
+    if observer is not None:
+        observer.phase_start('knapsack')
+    for i, (value, weight) in enumerate(items):
+        if observer is not None:
+            observer.progress('knapsack', i, len(items), states=states,
+                              frontier=len(weights))
+        # Only the pairs that still fit after adding the item can be shifted.
+        fits = weights <= (size - weight)
+        weights = np.concatenate((weights, weights[fits] + weight))
+        values = np.concatenate((values, values[fits] + value))
+        states += int(np.count_nonzero(fits))
+        # Order by weight; for equal weights, put the larger value first.
+        order = np.lexsort((-values, weights))
+        weights, values = weights[order], values[order]
+        # Keep a pair only if it beats every pair with a smaller weight.
+        best = np.maximum.accumulate(values)
+        keep = np.ones(len(values), dtype=bool)
+        keep[1:] = values[1:] > best[:-1]
+        weights, values = weights[keep], values[keep]
+    if observer is not None:
+        observer.progress('knapsack', len(items), len(items), states=states,
+                          frontier=len(weights))
+        observer.phase_end('knapsack', engine='sparse', states=states)
+    # Values increase along the frontier, so the last pair is the best one.
+    return int(values[-1]), states
+
+
+def knapsack_values(items, size, observer=None):
+    '''
+    INPUT: List, Int, Observer
+    OUTPUT: Int, Int
+
+    Solve the knapsack problem with a table indexed by value rather than by
+    capacity: the minimum weight needed to reach each value exactly, from 0 up
+    to the total value of the items. Its cost does not depend on the knapsack
+    size, so it suits huge capacities with small values. As in knapsack_row,
+    each item's row is a single shifted element-wise minimum, over only the
+    values reachable by the items seen so far. Return the maximum value whose
+    minimum weight fits, as well as the number of table cells updated.
+    If an observer is given, report the progress after each item.
+    '''
+    # Items heavier than the knapsack, or without value, are never chosen.
+    items = [(value, weight) for value, weight in items
+             if weight <= size and value > 0]
+    total = sum(value for value, weight in items)
+    # Any weight above the size means the value cannot be reached (yet).
+    min_weight = np.full(total + 1, size + 1, dtype=np.int64)
+    min_weight[0] = 0
+    # Scratch buffer for the shifted row, allocated once and reused per item.
+    shifted = np.empty(total + 1, dtype=np.int64)
+    reachable = 0
+    states = 0
+    if observer is not None:
+        observer.phase_start('knapsack',
+                             bytes=min_weight.nbytes + shifted.nbytes)
+    for i, (value, weight) in enumerate(items):
+        if observer is not None:
+            observer.progress('knapsack', i, len(items), states=states)
+        reachable += value
+        high = reachable + 1
+        buffer = shifted[:high - value]
+        # min_weight[v] = min(min_weight[v], min_weight[v - value] + weight)
+        np.add(min_weight[:high - value], weight, out=buffer)
+        np.minimum(min_weight[value:high], buffer,
+                   out=min_weight[value:high])
+        states += high - value
+    if observer is not None:
+        observer.progress('knapsack', len(items), len(items), states=states)
+        observer.phase_end('knapsack', engine='values', states=states)
+    return int(np.flatnonzero(min_weight <= size)[-1]), states
+
+
+def knapsack_branch_and_bound(items, size, max_nodes=None, max_seconds=None,
+                              observer=None):
+    '''
+    INPUT: List, Int, Int, Float, Observer
+    OUTPUT: Int, Int, Boolean
+
+    Solve the knapsack problem by a depth-first branch and bound over the
+    items sorted by value per unit of weight, deciding one item per level
+    (taking it first). Each node is bounded by the fractional (Dantzig)
+    relaxation: the greedy run of remaining items that fit entirely, plus
+    the fitting fraction of the next one. Prefix sums of the sorted weights
+    and values give the bound with a single binary search. The greedy run
+    itself is a feasible solution, which improves the incumbent as it goes.
+    Nodes whose bound cannot beat the incumbent are pruned.
+
+    The search stops early once max_nodes nodes have been explored, or after
+    max_seconds seconds (both unbounded by default). Return the best value
+    found, the number of nodes explored, and whether the value is proven
+    optimal, i.e. whether the search finished within its budget.
+    If an observer is given, report the progress every 1024 nodes.
+    '''
+    # Weightless items are always taken; the rest are sorted by exact ratio.
+    base = sum(value for value, weight in items if weight == 0 and value > 0)
+    items = sorted(((value, weight) for value, weight in items
+                    if 0 < weight <= size and value > 0),
+                   key=lambda item: Fraction(-item[0], item[1]))
+    n = len(items)
+    values = [value for value, weight in items]
+    weights = [weight for value, weight in items]
+    prefix_values = [0] * (n + 1)
+    prefix_weights = [0] * (n + 1)
+    for i in range(n):
+        prefix_values[i + 1] = prefix_values[i] + values[i]
+        prefix_weights[i + 1] = prefix_weights[i] + weights[i]
+
+    best = 0
+    nodes = 0
+    optimal = True
+    time_0 = time()
+    # Explicit stack of (next item, remaining capacity, value so far) nodes.
+    stack = [(0, size, 0)]
+    if observer is not None:
+        observer.phase_start('knapsack')
+    while stack:
+        if max_nodes is not None and nodes >= max_nodes:
+            optimal = False
+            break
+        if not nodes % 1024:
+            if max_seconds is not None and time() - time_0 > max_seconds:
+                optimal = False
+                break
+            if observer is not None:
+                observer.progress('knapsack', nodes, max_nodes, best=best)
+        i, capacity, value = stack.pop()
+        nodes += 1
+        # Items i to (j - 1) all fit, in order; item j is the first that won't.
+        j = bisect_right(prefix_weights, prefix_weights[i] + capacity, i) - 1
+        greedy = value + prefix_values[j] - prefix_values[i]
+        if greedy > best:
+            best = greedy
+        if j == n:
+            # Every remaining item fits, so the greedy run is optimal here.
+            continue
+        remaining = capacity - (prefix_weights[j] - prefix_weights[i])
+        # Values are integers, so the bound can be rounded down.
+        if greedy + remaining * values[j] // weights[j] <= best:
+            continue
+        # Leave the item out (explored last), or take it (explored first).
+        stack.append((i + 1, capacity, value))
+        if weights[i] <= capacity:
+            stack.append((i + 1, capacity - weights[i], value + values[i]))
+    if observer is not None:
+        observer.progress('knapsack', nodes, max_nodes, best=best)
+        observer.phase_end('knapsack', engine='branch_and_bound',
+                           nodes=nodes, optimal=optimal)
+    return base + best, nodes, optimal
+
+
+def knapsack_dispatch(items, size, max_cells=MAX_TABLE_CELLS,
+                      max_bytes=MAX_TABLE_BYTES, max_nodes=10 ** 7,
+                      max_seconds=None, observer=None):
+    '''
+    INPUT: List, Int, Int, Int, Int, Float, Observer
+    OUTPUT: Int, Dictionary
+
+    Pick a knapsack engine from the profile of the instance. Items that never
+    fit, or have no value, are dropped first. Then compare the size of the
+    table indexed by capacity (knapsack_numpy) with the one indexed by value
+    (knapsack_values), and use the smaller, as long as it has at most
+    max_cells cells and its rows take at most max_bytes. Otherwise, e.g. for
+    huge capacities with large values, fall back to knapsack_branch_and_bound,
+    within the given node and time budgets. Return the maximum value (the best
+    found, if the budget ran out), and a report: the engine that ran, the work
+    it performed (table cells updated, or nodes explored) and whether the
+    value is proven optimal.
+    '''
+    items = [(value, weight) for value, weight in items
+             if weight <= size and value > 0]
+    total = sum(value for value, weight in items)
+    # Cells of each table, and the bytes of its row and scratch buffer.
+    tables = {'numpy': (len(items) * (size + 1), 2 * 8 * (size + 1)),
+              'values': (len(items) * (total + 1), 2 * 8 * (total + 1))}
+    engine = min(tables, key=lambda name: tables[name][0])
+    cells, row_bytes = tables[engine]
+    if cells > max_cells or row_bytes > max_bytes:
+        value, nodes, optimal = knapsack_branch_and_bound(
+            items, size, max_nodes, max_seconds, observer)
+        return value, {'engine': 'branch_and_bound', 'nodes': nodes,
+                       'optimal': optimal}
+    if engine == 'numpy':
+        value, states = knapsack_numpy(items, size, observer=observer), cells
+    else:
+        value, states = knapsack_values(items, size, observer)
+    return value, {'engine': engine, 'states': states, 'optimal': True}
+
+
+def memory_chunk_size(size, max_bytes):
+    '''
+    INPUT: Int, Int
+    OUTPUT: Int
+
+    Return the largest chunk size for knapsack_numpy such that the row and its
+    scratch buffer fit within the given number of bytes. Raise a ValueError if
+    the row alone (8 bytes per capacity) does not fit within the ceiling.
+    '''
+    itemsize = np.dtype(np.int64).itemsize
+    row_bytes = (size + 1) * itemsize
+    chunk_size = (max_bytes - row_bytes) // itemsize
+    if chunk_size < 1:
+        raise ValueError('Knapsack of size {} needs more than {} bytes'
+                         .format(size, max_bytes))
+    return min(chunk_size, size + 1)
+
+
 def read_file(filename):
     '''
     INPUT: String
@@ -61,7 +403,7 @@ def print_answer(size, capacity, value):
 
 if __name__ == '__main__':
     items_small, size_small, n_small = read_file('knapsack1.txt')
-    value_small = knapsack_algorithm(items_small, size_small)
+    value_small = knapsack_algorithm(items_small, size_small, ConsoleLog())
     print_answer('Small', size_small, value_small)
     # Answer 1 = 2493893
 
@@ -69,9 +411,12 @@ if __name__ == '__main__':
 
     items_large, size_large, n_large = read_file('knapsack_big.txt')
     time_0 = time()
-    value_large = knapsack_algorithm(items_large, size_large)
+    value_large, report = knapsack_dispatch(items_large, size_large,
+                                            observer=ConsoleLog())
     time_1 = time()
     print_answer('Large', size_large, value_large)
+    print('Knapsack (Large) - Engine:\t{}'.format(report['engine']))
     print('Time Required (Seconds):\t{}'.format(time_1 - time_0))
     # Answer 2 = 4243395
-    # Time Required: 1974 Seconds = 33 Minutes
+    # Time Required: 1974 Seconds = 33 Minutes, with knapsack_algorithm;
+    # 0.03 Seconds with branch and bound (8425 nodes), picked by the dispatcher
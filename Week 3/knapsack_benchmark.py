@@ -0,0 +1,85 @@
+from knapsack_algorithm import (knapsack_algorithm, knapsack_branch_and_bound,
+                                knapsack_dispatch, knapsack_items,
+                                knapsack_numpy, knapsack_sparse,
+                                knapsack_values, memory_chunk_size, read_file)
+from time import time
+import tracemalloc
+
+
+def benchmark(items, size, engines, trace_memory=False):
+    '''
+    INPUT: List, Int, Dictionary, Boolean
+    OUTPUT: Dictionary
+
+    Run each of the given knapsack engines (a dictionary of names to functions
+    taking the items and the knapsack size) on the same instance. Return, for
+    each engine, the value it found, the time it took (in seconds), and, if
+    memory is traced, the peak memory it allocated (in bytes). Tracing slows
+    down pure-Python engines considerably, so it is off by default.
+    '''
+    results = {}
+    for name, engine in engines.items():
+        if trace_memory:
+            tracemalloc.start()
+        time_0 = time()
+        value = engine(items, size)
+        time_1 = time()
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results[name] = (value, time_1 - time_0, peak)
+    return results
+
+
+def print_results(filename, results):
+    '''
+    INPUT: String, Dictionary
+    OUTPUT: None
+
+    Print the value, time and peak memory (if traced) of each engine, as well
+    as whether the values agree.
+    '''
+    for name, (value, seconds, peak) in results.items():
+        memory = '' if peak is None else \
+            '\tPeak Memory: {:>8.1f} MB'.format(peak / 2 ** 20)
+        print('{} - {:<16}\tValue: {:>10}\tTime: {:>10.3f} Seconds{}'
+              .format(filename, name, value, seconds, memory))
+    values = set(value for value, seconds, peak in results.values())
+    print('{} - Engines Agree:\t{}'.format(filename, len(values) == 1))
+
+
+if __name__ == '__main__':
+    divider = '\n{}\n'.format('-' * 60)
+    filenames = ['knapsack1.txt', 'knapsack_big.txt']
+    # Memory ceiling for the chunked engine: 64 MB, row and buffer included.
+    max_bytes = 64 * 2 ** 20
+
+    for filename in filenames:
+        items, size, n = read_file(filename)
+        chunk_size = memory_chunk_size(size, max_bytes)
+        engines = {
+            'List': knapsack_algorithm,
+            'NumPy': knapsack_numpy,
+            'NumPy (Chunked)': lambda items, size:
+                knapsack_numpy(items, size, chunk_size),
+            'Sparse': lambda items, size: knapsack_sparse(items, size)[0],
+            'Values': lambda items, size: knapsack_values(items, size)[0],
+            'Branch and Bound': lambda items, size:
+                knapsack_branch_and_bound(items, size)[0],
+            'Dispatch': lambda items, size:
+                knapsack_dispatch(items, size)[0],
+        }
+        print_results(filename, benchmark(items, size, engines))
+        print(divider)
+    # knapsack_big.txt - List:  1974 Seconds = 33 Minutes
+    # knapsack_big.txt - Values:  288 Seconds (the total value is ~10 ** 8)
+
+    # Compare the cost of also recovering the chosen items to the value alone.
+    items, size, n = read_file('knapsack_big.txt')
+    engines = {
+        'Value Only': knapsack_numpy,
+        'Value + Items': lambda items, size: knapsack_items(items, size)[0],
+    }
+    print_results('knapsack_big.txt',
+                  benchmark(items, size, engines, trace_memory=True))
@@ -1,11 +1,30 @@
 import numpy as np
-import networkx as nx
+import heapq
+import multiprocessing
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from time import time
+from graph_core import CSRGraph, read_edges
+
+# Johnson's algorithm costs about n * m heap operations in Python, whereas the
+# Floyd-Warshall algorithm costs n ** 3 (much cheaper) NumPy operations. Below
+# this edge density (m / n ** 2), Johnson's algorithm is the faster of the 2.
+MAX_JOHNSON_DENSITY = 0.001
+
+# The Floyd-Warshall engines keep the full n x n matrix of float64 distances.
+# Above this many bytes (1 GB, i.e. n > 11585), Johnson's algorithm is used
+# instead, whatever the density: its memory grows with m, not n ** 2.
+MAX_MATRIX_BYTES = 2 ** 30
+
+# The CSR graph, memory-mapped by each worker process of johnson_parallel.
+SHARED_GRAPH = {}
 
 
 def floyd_warshall(graph, num_nodes):
     '''
-    INPUT: NetworkX Graph, Int
+    INPUT: NetworkX Graph or CSRGraph, Int
     OUTPUT: None or Float
 
     Use the Floyd-Warshall algorithm to calculate the shortest path amongst all
@@ -13,10 +32,7 @@ def floyd_warshall(graph, num_nodes):
     'None'. Otherwise, return the shortest distance found, of all the paths.
     '''
     # Base Case
-    A = np.zeros((num_nodes, num_nodes)) + float('inf')
-    np.fill_diagonal(A, 0)
-    for node1, node2 in graph.edges():
-        A[node1 - 1, node2 - 1] = graph[node1][node2]['weight']
+    A = distance_matrix(graph, num_nodes)
     # A[i, j, k] = min( A[i, j, k - 1],
     #                   A[i, k, k - 1] + A[k, j, k - 1] )
     for k in range(num_nodes):
@@ -31,6 +47,427 @@ def floyd_warshall(graph, num_nodes):
     return np.min(A)
 
 
+def floyd_warshall_blocked(graph, num_nodes, block_size=256, dtype=np.float64):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int, Int, Numpy Dtype
+    OUTPUT: None or Number
+
+    Blocked (tiled) version of the Floyd-Warshall algorithm, which updates the
+    distance matrix in place, a tile at a time, so that each tile stays in the
+    cache for all of the intermediate nodes in the current block. Three phases
+    are run per block of intermediate nodes: the diagonal tile, then the tiles
+    in the same rows and columns, and finally all of the remaining tiles. The
+    dtype may be an integer type (e.g. int32) for integer-weighted graphs, in
+    which case half of the largest integer is used as the infinity sentinel.
+
+    A negative cycle is detected as soon as its largest node k is reached: at
+    that point, A[k, k] holds the shortest path from k back to itself through
+    the smaller nodes, i.e. the cycle. Return 'None' right away in that case.
+    Otherwise, return the shortest distance found, of all the paths.
+    '''
+    A = distance_matrix(graph, num_nodes, dtype)
+    # Scratch buffer for A[i, k] + A[k, j], reused for every tile and node k.
+    buffer = np.empty((block_size, block_size), dtype=A.dtype)
+    blocks = [slice(start, min(start + block_size, num_nodes))
+              for start in range(0, num_nodes, block_size)]
+    for K in blocks:
+        diagonal = A[K, K]
+        # Phase 1: the diagonal tile only depends on itself.
+        for k in range(K.stop - K.start):
+            if diagonal[k, k] < 0:
+                return None
+            relax_tile(diagonal, diagonal[:, k], diagonal[k, :], buffer)
+        # Phase 2: tiles in the rows and columns of the diagonal tile.
+        for J in blocks:
+            if J != K:
+                row, column = A[K, J], A[J, K]
+                for k in range(K.stop - K.start):
+                    relax_tile(row, diagonal[:, k], row[k, :], buffer)
+                    relax_tile(column, column[:, k], diagonal[k, :], buffer)
+        # Phase 3: the remaining tiles only depend on the phase 2 tiles.
+        for block in blocks:
+            if block == K:
+                continue
+            for J in blocks:
+                if J == K:
+                    continue
+                tile, column, row = A[block, J], A[block, K], A[K, J]
+                for k in range(K.stop - K.start):
+                    relax_tile(tile, column[:, k], row[k, :], buffer)
+    return np.min(A)
+
+
+def relax_tile(tile, column, row, buffer):
+    '''
+    INPUT: Numpy Array, Numpy Array, Numpy Array, Numpy Array
+    OUTPUT: None
+
+    Update the tile in place: tile[i, j] = min(tile[i, j], column[i] + row[j]).
+    The sums are written into the scratch buffer, so nothing is allocated.
+    '''
+    candidate = buffer[:tile.shape[0], :tile.shape[1]]
+    np.add(column[:, np.newaxis], row, out=candidate)
+    np.minimum(tile, candidate, out=tile)
+
+
+def min_plus_squaring(graph, num_nodes, block_size=32, num_threads=1,
+                      dtype=np.float64):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int, Int, Int, Numpy Dtype
+    OUTPUT: None or Number
+
+    Calculate the shortest path amongst all pairs of vertices by repeatedly
+    squaring the distance matrix in the min-plus semiring: after s squarings,
+    A[i, j] is the shortest path from i to j of at most 2 ** s edges. Each
+    product is computed a tile at a time (see min_plus_product), optionally
+    across num_threads threads, as NumPy releases the GIL. The dtype may be an
+    integer type, as for floyd_warshall_blocked.
+
+    Squaring stops early once the matrix stops changing, after about
+    log2(diameter) products, since longer paths can no longer be shorter.
+    A negative cycle of c edges shows up on the diagonal as soon as paths of c
+    edges are covered, so the diagonal is checked after every product, and
+    'None' is returned right away. Otherwise, after ceil(log2(n)) products,
+    every path of up to n edges is covered. Return the shortest distance found,
+    of all the paths.
+    '''
+    A = distance_matrix(graph, num_nodes, dtype)
+    # Integer sums of "infinity" and a negative distance drift below it; reset
+    # them, so that they do not count as changes. Real distances stay below
+    # half of infinity (see distance_matrix).
+    infinity = A.dtype.type(np.iinfo(A.dtype).max // 2) \
+        if np.issubdtype(A.dtype, np.integer) else None
+    # The number of edges of the paths covered so far.
+    covered = 1
+    while True:
+        # Negative self-loops are already on the diagonal, before any product.
+        if np.any(np.diag(A) < 0):
+            return None
+        if covered >= num_nodes:
+            break
+        B = min_plus_product(A, A, block_size, num_threads)
+        if infinity is not None:
+            np.putmask(B, B > infinity // 2, infinity)
+        covered *= 2
+        if np.array_equal(A, B):
+            break
+        A = B
+    return np.min(A)
+
+
+def min_plus_product(A, B, block_size=32, num_threads=1):
+    '''
+    INPUT: Numpy Array, Numpy Array, Int, Int
+    OUTPUT: Numpy Array
+
+    Return the min-plus product C of 2 square matrices:
+    C[i, j] = min over k of A[i, k] + B[k, j]. C is computed one tile C[I, J]
+    at a time, reducing over tiles K of the inner dimension, each with a
+    single broadcast of A[I, K] and B[K, J] into a (K, I, J) scratch buffer,
+    small enough to stay in the cache, and a minimum over its first axis. Row
+    blocks I are split between num_threads threads, each with its own buffer.
+    '''
+    n = A.shape[0]
+    # The transpose of A, so that each A[I, K].T is read from contiguous rows.
+    A_T = np.ascontiguousarray(A.T)
+    C = np.empty_like(A)
+    blocks = [slice(start, min(start + block_size, n))
+              for start in range(0, n, block_size)]
+
+    def multiply_rows(row_blocks):
+        buffer = np.empty((block_size, block_size, block_size), dtype=A.dtype)
+        reduced = np.empty((block_size, block_size), dtype=A.dtype)
+        for row_block in row_blocks:
+            for J in blocks:
+                tile = C[row_block, J]
+                for K in blocks:
+                    sums = buffer[:K.stop - K.start, :tile.shape[0],
+                                  :tile.shape[1]]
+                    np.add(A_T[K, row_block][:, :, np.newaxis],
+                           B[K, J][:, np.newaxis, :], out=sums)
+                    # The first tile K initializes it; the rest update it.
+                    if K.start == 0:
+                        np.min(sums, axis=0, out=tile)
+                    else:
+                        minimum = reduced[:tile.shape[0], :tile.shape[1]]
+                        np.min(sums, axis=0, out=minimum)
+                        np.minimum(tile, minimum, out=tile)
+
+    if num_threads <= 1:
+        multiply_rows(blocks)
+    else:
+        with ThreadPoolExecutor(num_threads) as executor:
+            # Deal the row blocks out in turn, so each thread gets a share.
+            list(executor.map(multiply_rows, [blocks[i::num_threads]
+                                              for i in range(num_threads)]))
+    return C
+
+
+def distance_matrix(graph, num_nodes, dtype=np.float64):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int, Numpy Dtype
+    OUTPUT: Numpy Array
+
+    Return the matrix of direct distances between the nodes of the graph: 0 on
+    the diagonal, the weight for edges (the shortest, if there are parallel
+    edges), and infinity elsewhere. For integer dtypes, infinity is half of
+    the largest integer, so that adding 2 of them cannot overflow. It must
+    also exceed any path through a missing edge, so raise a ValueError if the
+    weights are too large for the dtype.
+    '''
+    offsets, targets, weights = csr_adjacency(graph, num_nodes)
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        infinity = np.iinfo(dtype).max // 2
+        max_weight = int(np.abs(weights).max(initial=0))
+        if 2 * num_nodes * max_weight >= infinity:
+            raise ValueError('Weights up to {} on {} nodes overflow {}'
+                             .format(max_weight, num_nodes, dtype))
+    else:
+        infinity = np.inf
+    A = np.full((num_nodes, num_nodes), infinity, dtype=dtype)
+    np.fill_diagonal(A, 0)
+    tails = np.repeat(np.arange(num_nodes), np.diff(offsets))
+    np.minimum.at(A, (tails, targets), weights.astype(dtype))
+    return A
+
+
+def all_pairs_shortest_path(graph, num_nodes, max_density=MAX_JOHNSON_DENSITY,
+                            max_bytes=MAX_MATRIX_BYTES, num_workers=1):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int, Float, Int, Int
+    OUTPUT: None or Number
+
+    Choose between the (blocked) Floyd-Warshall algorithm and Johnson's
+    algorithm. Johnson's algorithm is used if the graph has fewer than
+    max_density * n ** 2 edges, or if the n x n float64 distance matrix of
+    the Floyd-Warshall algorithm would take more than max_bytes, however
+    dense the graph. Johnson's algorithm runs in a single process by default,
+    or with johnson_parallel if num_workers is not 1 (None for one worker per
+    CPU). Either way, return 'None' if a negative cycle is found, else the
+    shortest distance.
+    '''
+    # Convert the graph only once, for whichever algorithm is chosen.
+    graph = CSRGraph(*csr_adjacency(graph, num_nodes))
+    matrix_bytes = num_nodes ** 2 * np.dtype(np.float64).itemsize
+    if graph.num_edges < max_density * num_nodes ** 2 or \
+            matrix_bytes > max_bytes:
+        if num_workers == 1:
+            return johnson(graph, num_nodes)
+        return johnson_parallel(graph, num_nodes, num_workers)[0]
+    return floyd_warshall_blocked(graph, num_nodes)
+
+
+def johnson(graph, num_nodes):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int
+    OUTPUT: None or Float
+
+    Use Johnson's algorithm to calculate the shortest path amongst all pairs of
+    vertices in a sparse, directed graph. First, run the Bellman-Ford algorithm
+    from a virtual source (with 0-weight edges to every node) to find a vertex
+    potential h; this also finds any negative cycles, in which case return
+    'None'. Reweighting each edge (u, v) as w(u, v) + h[u] - h[v] makes every
+    weight non-negative, without changing which paths are the shortest, so that
+    Dijkstra's algorithm can then be run from every node. Return the shortest
+    distance found, of all the paths.
+    '''
+    offsets, targets, weights = csr_adjacency(graph, num_nodes)
+    potentials = bellman_ford(offsets, targets, weights, num_nodes)
+    if potentials is None:
+        return None
+    reweighted = reweight(offsets, targets, weights, potentials)
+    return min_distance_from(range(num_nodes), offsets, targets, reweighted,
+                             potentials)
+
+
+def johnson_parallel(graph, num_nodes, num_workers=None, batch_size=64):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int, Int, Int
+    OUTPUT: None or Float, Dictionary
+
+    Parallel version of Johnson's algorithm. The Bellman-Ford pass is run
+    first, so a negative cycle returns 'None' before any worker is started.
+    The Dijkstra searches are then fanned out, in batches of sources, to a
+    pool of num_workers processes (by default, one per CPU). Rather than being
+    pickled for every batch, the reweighted CSR graph is saved once to .npy
+    files, which each worker memory-maps when it starts, then reuses for all
+    of its batches: the workers share one copy of the graph, through the page
+    cache, rather than each holding its own. The batch results are
+    reduced to the overall shortest distance as they come in. Also return,
+    for each worker (by process ID), the number of sources it searched and
+    the time it spent on them, in seconds.
+    '''
+    offsets, targets, weights = csr_adjacency(graph, num_nodes)
+    potentials = bellman_ford(offsets, targets, weights, num_nodes)
+    if potentials is None:
+        return None, {}
+    batches = [range(start, min(start + batch_size, num_nodes))
+               for start in range(0, num_nodes, batch_size)]
+    min_distance = 0.0
+    workers = defaultdict(lambda: [0, 0.0])
+    with tempfile.TemporaryDirectory() as directory:
+        arrays = {'offsets': offsets, 'targets': targets,
+                  'reweighted': reweight(offsets, targets, weights,
+                                         potentials),
+                  'potentials': potentials}
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, name + '.npy'), array)
+        with multiprocessing.Pool(num_workers, initializer=load_shared_graph,
+                                  initargs=(directory,)) as pool:
+            for distance, worker, count, seconds in \
+                    pool.imap_unordered(search_batch, batches):
+                min_distance = min(min_distance, distance)
+                workers[worker][0] += count
+                workers[worker][1] += seconds
+    return min_distance, {worker: tuple(stats)
+                          for worker, stats in workers.items()}
+
+
+def load_shared_graph(directory):
+    '''
+    INPUT: String
+    OUTPUT: None
+
+    Worker initializer: memory-map the reweighted CSR graph and the potentials
+    (read-only) from the .npy files in the given directory, once per worker
+    rather than once per batch. They are viewed as plain arrays, which slice
+    faster than memmaps, but still share the mapped pages.
+    '''
+    for name in ['offsets', 'targets', 'reweighted', 'potentials']:
+        SHARED_GRAPH[name] = np.load(os.path.join(directory, name + '.npy'),
+                                     mmap_mode='r').view(np.ndarray)
+
+
+def search_batch(sources):
+    '''
+    INPUT: Range
+    OUTPUT: Number, Int, Int, Float
+
+    Worker task: run Dijkstra's algorithm from each source of the batch, over
+    the shared graph. Return the shortest distance found, the worker's process
+    ID, the number of sources searched, and the time taken, in seconds.
+    '''
+    time_0 = time()
+    distance = min_distance_from(sources, SHARED_GRAPH['offsets'],
+                                 SHARED_GRAPH['targets'],
+                                 SHARED_GRAPH['reweighted'],
+                                 SHARED_GRAPH['potentials'])
+    time_1 = time()
+    return distance, os.getpid(), len(sources), time_1 - time_0
+
+
+def reweight(offsets, targets, weights, potentials):
+    '''
+    INPUT: Numpy Array, Numpy Array, Numpy Array, Numpy Array
+    OUTPUT: Numpy Array
+
+    Return the reweighted (non-negative) weight of each edge (u, v) of the CSR
+    graph: w(u, v) + h[u] - h[v], given the potentials h.
+    '''
+    tails = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return weights + potentials[tails] - potentials[targets]
+
+
+def min_distance_from(sources, offsets, targets, reweighted, potentials):
+    '''
+    INPUT: Iterable, Numpy Array, Numpy Array, Numpy Array, Numpy Array
+    OUTPUT: Float
+
+    Run Dijkstra's algorithm, over the reweighted graph (in CSR form), from
+    each of the given sources. Return the shortest (original) distance found
+    from any of them, including the 0-length path from each source to itself,
+    as a float (like the Floyd-Warshall engines).
+    '''
+    min_distance = 0
+    for source in sources:
+        distances = dijkstra(source, offsets, targets, reweighted)
+        reached = np.isfinite(distances)
+        # Undo the reweighting: d(s, v) = d'(s, v) - h[s] + h[v]
+        shortest = (distances[reached] - potentials[source]
+                    + potentials[reached])
+        min_distance = min(min_distance, shortest.min())
+    return float(min_distance)
+
+
+def dijkstra(source, offsets, targets, weights):
+    '''
+    INPUT: Int, Numpy Array, Numpy Array, Numpy Array
+    OUTPUT: Numpy Array
+
+    Use Dijkstra's algorithm, with a (lazy) min-heap, to calculate the shortest
+    distance from the source to every node of a graph with non-negative edge
+    weights, given in CSR form. Unreachable nodes are at an infinite distance.
+    The graph stays in NumPy arrays (e.g. memory-mapped, and shared between
+    processes); only the edges of each node settled are converted to lists,
+    which are much faster than arrays for scalar access.
+    '''
+    distances = [float('inf')] * (len(offsets) - 1)
+    distances[source] = 0
+    heap = [(0, source)]
+    while heap:
+        distance, node = heapq.heappop(heap)
+        # Skip stale heap entries, for nodes already reached by a shorter path.
+        if distance > distances[node]:
+            continue
+        start, stop = offsets[node], offsets[node + 1]
+        for neighbor, weight in zip(targets[start:stop].tolist(),
+                                    weights[start:stop].tolist()):
+            new_distance = distance + weight
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                heapq.heappush(heap, (new_distance, neighbor))
+    return np.array(distances)
+
+
+def bellman_ford(offsets, targets, weights, num_nodes):
+    '''
+    INPUT: Numpy Array, Numpy Array, Numpy Array, Int
+    OUTPUT: None or Numpy Array
+
+    Use the Bellman-Ford algorithm to calculate the shortest distance to every
+    node from a virtual source, which has a 0-weight edge to each node. Every
+    round relaxes all of the edges at once. If the distances still change after
+    num_nodes rounds, there is a negative cycle, so return 'None'. Otherwise,
+    return the distances, to be used as the potentials for Johnson's algorithm.
+    '''
+    potentials = np.zeros(num_nodes, dtype=weights.dtype)
+    # An empty graph has no cycles at all, let alone negative ones.
+    if num_nodes == 0:
+        return potentials
+    tails = np.repeat(np.arange(num_nodes), np.diff(offsets))
+    # Paths from the virtual source have at most num_nodes + 1 edges.
+    for i in range(num_nodes):
+        updated = potentials.copy()
+        np.minimum.at(updated, targets, potentials[tails] + weights)
+        if np.array_equal(updated, potentials):
+            return potentials
+        potentials = updated
+    return None
+
+
+def csr_adjacency(graph, num_nodes):
+    '''
+    INPUT: NetworkX Graph or CSRGraph, Int
+    OUTPUT: Numpy Array, Numpy Array, Numpy Array
+
+    Convert the graph (with nodes 1 to num_nodes) into compressed sparse row
+    form, with 0-indexed nodes; a CSRGraph (already 0-indexed) is used as is.
+    The edges leaving node u are those with indices offsets[u] to
+    offsets[u + 1], and they are stored in the targets (heads) and weights
+    arrays. Return the offsets, targets, and weights arrays.
+    '''
+    if not isinstance(graph, CSRGraph):
+        edges = list(graph.edges(data='weight'))
+        tails = np.array([node1 - 1 for node1, node2, weight in edges],
+                         dtype=np.int64)
+        heads = np.array([node2 - 1 for node1, node2, weight in edges],
+                         dtype=np.int64)
+        weights = np.array([weight for node1, node2, weight in edges])
+        graph = CSRGraph.from_edges(tails, heads, weights, num_nodes)
+    return graph.offsets, graph.targets, graph.weights
+
+
 def read_file(filename):
     '''
     INPUT: String
@@ -41,6 +478,8 @@ def read_file(filename):
     tail, its head, and its weight, respectively. Save as a NetworkX graph.
     When done reading, return the graph, number of nodes, and number of edges.
     '''
+    # NetworkX is only needed by this reader; see read_file_csr otherwise.
+    import networkx as nx
     graph = nx.DiGraph()
     with open(filename) as f:
         num_nodes, num_edges = map(int, f.readline().split())
@@ -51,6 +490,21 @@ def read_file(filename):
     return graph, num_nodes, num_edges
 
 
+def read_file_csr(filename, cache=False):
+    '''
+    INPUT: String, Boolean
+    OUTPUT: CSRGraph, Int, Int
+
+    Same as read_file, but parse the whole file at once into a CSRGraph (with
+    0-indexed nodes), which all of the algorithms above also accept. If cache
+    is True, the parsed graph is kept in a binary .npz file next to the given
+    file, which is read instead on later runs.
+    '''
+    graph = read_edges(filename, cache=cache)
+    print('Finished Reading {}\n'.format(filename))
+    return graph, graph.num_nodes, graph.num_edges
+
+
 if __name__ == '__main__':
     divider = '\n{}\n'.format('-' * 60)
     # filenames = ['g{}.txt'.format(i + 1) for i in range(3)]
@@ -58,9 +512,10 @@ if __name__ == '__main__':
     distances = []
 
     for filename in filenames:
-        graph, num_nodes, num_edges = read_file(filename)
+        graph, num_nodes, num_edges = read_file_csr(filename)
         time_0 = time()
-        distance = floyd_warshall(graph, num_nodes)
+        # Johnson's algorithm, if chosen, runs with one worker per CPU.
+        distance = all_pairs_shortest_path(graph, num_nodes, num_workers=None)
         time_1 = time()
         distances.append(distance)
         print('\n{} - Minimum Distance:\t{}'.format(filename, distance))
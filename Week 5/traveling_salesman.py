@@ -1,28 +1,42 @@
 import numpy as np
 import itertools
+import glob
+import hashlib
+import multiprocessing
+import os
+from math import comb
+from multiprocessing import shared_memory
 from sklearn.metrics.pairwise import euclidean_distances
 from time import time
+from instrumentation import ConsoleLog
 
+# The 2 layers (and inputs), attached by each worker of the parallel solver.
+SHARED_LAYERS = {}
 
-def traveling_salesman(source, cities, num_cities):
+
+def traveling_salesman(source, cities, num_cities, observer=None):
     '''
-    INPUT: List, Int
-    OUTPUT:
+    INPUT: Int, Numpy Array, Int, Observer
+    OUTPUT: Float
 
     Find the minimum distance that a traveling salesman must travel, in order
     to visit all cities once, before returning back to origin (source) city.
+    If an observer is given, report the initialization and each layer (subset
+    size) as phases.
     '''
     distances = euclidean_distances(cities)  # Calculates pairwise distances.
     # Base Case
-    t1 = time()
+    if observer is not None:
+        observer.phase_start('initialization')
     A = np.zeros((binary_hash(range(num_cities)) + 1, num_cities)) + np.inf
     A[binary_hash([source]), 0] = 0
-    t2 = time()
-    print('Initialization:\t{:>6.1f} Seconds'.format(t2 - t1))
+    if observer is not None:
+        observer.phase_end('initialization', bytes=A.nbytes)
     # List of cities that excludes source city that salesperson starts from.
     other_cities = [i for i in range(num_cities) if i != source]
     for m in range(1, num_cities):  # m = Subproblem (Subset) Size - 1
-        t1 = time()  # Time
+        if observer is not None:
+            observer.phase_start('layer', m=m)
         for combination in itertools.combinations(other_cities, m):
             subset = (source,) + combination  # Add source city back to subset.
             subset_key = binary_hash(subset)  # Compute binary hash for subset.
@@ -35,8 +49,9 @@ def traveling_salesman(source, cities, num_cities):
                         min_distance = min(min_distance,
                                            A[prev_key, k] + distances[k, j])
                 A[subset_key, j] = min_distance
-        t2 = time()  # Time
-        print('Iteration {:>2}:\t{:>6.1f} Seconds'.format(m, t2 - t1))  # Time
+        if observer is not None:
+            observer.phase_end('layer', m=m,
+                               states=comb(num_cities - 1, m) * m)
     # Return final distance including last hop from last city back to source.
     min_distance = float('inf')
     subset_key = binary_hash(range(num_cities))
@@ -47,6 +62,411 @@ def traveling_salesman(source, cities, num_cities):
     return min_distance
 
 
+def traveling_salesman_bitmask(source, cities, num_cities, observer=None,
+                               dtype=np.float64):
+    '''
+    INPUT: Int, Numpy Array, Int, Observer, Numpy Dtype
+    OUTPUT: Float
+
+    Faster version of traveling_salesman. Since every subset contains the
+    source city, leave it out of the subsets altogether, which halves the
+    table; subsets of the other (num_cities - 1) cities are then simply the
+    integers (bitmasks) up to 2 ** (num_cities - 1), grouped by popcount
+    (subset size). For each city j, compute the entries A[S, j] of all subsets
+    S of the same size at once, as a vectorized minimum over the row
+    A[S - j, :] + distances[:, j]. Return the minimum distance of a tour. If
+    an observer is given, report the initialization and each layer as phases.
+
+    The table is float64 by default, which gives the same answer as
+    traveling_salesman. A dtype of float32 halves the table again, but rounds
+    every distance to about 7 significant digits, e.g. 26442.73046875 rather
+    than 26442.7303... for tsp.txt.
+    '''
+    if num_cities == 1:
+        return 0.0
+    distances = euclidean_distances(cities).astype(dtype)
+    # Renumber the other cities 0 to (k - 1), so city i is the bitmask 2 ** i.
+    other_cities = [i for i in range(num_cities) if i != source]
+    k = len(other_cities)
+    between = distances[np.ix_(other_cities, other_cities)]
+    # Base Case: A[{j}, j] is the distance from the source city to city j.
+    if observer is not None:
+        observer.phase_start('initialization')
+    A = np.full((2 ** k, k), np.inf, dtype=dtype)
+    A[2 ** np.arange(k), np.arange(k)] = distances[source, other_cities]
+    popcounts = popcount_table(k)
+    if observer is not None:
+        observer.phase_end('initialization', bytes=A.nbytes)
+    for m in range(2, k + 1):  # m = Subproblem (Subset) Size - 1
+        if observer is not None:
+            observer.phase_start('layer', m=m)
+        subsets = np.flatnonzero(popcounts == m)
+        for j in range(k):
+            # A[S, j] = min_[k in S, k ≠ j] { A[S - j, k] + c[k, j] }
+            # Entries of A for cities k outside of (S - j) are all infinite.
+            with_j = subsets[(subsets >> j) & 1 == 1]
+            A[with_j, j] = (A[with_j ^ (1 << j)] + between[:, j]).min(axis=1)
+        if observer is not None:
+            observer.phase_end('layer', m=m, states=len(subsets) * m)
+    # Return final distance including last hop from last city back to source.
+    return float((A[-1] + distances[other_cities, source]).min())
+
+
+def popcount_table(k):
+    '''
+    INPUT: Int
+    OUTPUT: Numpy Array
+
+    Return the number of bits set in each of the integers 0 to (2 ** k - 1).
+    The second half of the table is the first half with the top bit set.
+    '''
+    popcounts = np.zeros(1, dtype=np.uint8)
+    for i in range(k):
+        popcounts = np.concatenate((popcounts, popcounts + 1))
+    return popcounts
+
+
+def traveling_salesman_layers(source, cities, num_cities, directory=None,
+                              max_bytes=None, chunk_size=2 ** 16,
+                              observer=None, dtype=np.float64):
+    '''
+    INPUT: Int, Numpy Array, Int, String, Int, Int, Observer, Numpy Dtype
+    OUTPUT: Float
+
+    Memory-bounded version of traveling_salesman_bitmask. Layer m (subsets of
+    size m, not counting the source city) only depends on layer m - 1, so only
+    those 2 layers are kept. Subsets are indexed by their rank in the
+    combinatorial number system, rather than by their bitmask, and only store
+    A[S, j] for the m cities j in S (by position), so layer m has shape
+    (C(k, m), m) rather than (2 ** k, k). Layers are computed a chunk of
+    subsets at a time, which bounds the temporary arrays.
+
+    If a directory is given (it is created if needed), each completed layer is
+    saved there, and a later call with the same directory (and instance)
+    resumes from the last completed layer; see load_last_layer. Any layer
+    larger than max_bytes is written straight to a memory-mapped file in the
+    directory, rather than kept in RAM. Return the minimum tour distance. If
+    an observer is given, report each layer as a phase, the progress through
+    its chunks, and the layer it resumed from, if any. The layers are float64
+    by default; as for traveling_salesman_bitmask, float32 halves them but
+    rounds the distances.
+    '''
+    if num_cities == 1:
+        return 0.0
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    distances = euclidean_distances(cities).astype(dtype)
+    other_cities = [i for i in range(num_cities) if i != source]
+    k = len(other_cities)
+    between = distances[np.ix_(other_cities, other_cities)]
+    binomials = binomial_table(k)
+    fingerprint = instance_fingerprint(source, distances)
+    m, previous = load_last_layer(directory, k, binomials, fingerprint,
+                                  observer)
+    if previous is None:
+        # Base Case: layer 1 holds the distances from the source to each city.
+        m, previous = 1, distances[source, other_cities].reshape(k, 1)
+    for m in range(m + 1, k + 1):  # m = Subproblem (Subset) Size - 1
+        if observer is not None:
+            observer.phase_start('layer', m=m)
+        current = new_layer(directory, m, (int(binomials[k, m]), m),
+                            max_bytes, dtype)
+        for start in range(0, len(current), chunk_size):
+            stop = min(start + chunk_size, len(current))
+            compute_layer(previous, current, start, stop, between, binomials)
+            if observer is not None:
+                observer.progress('layer', stop, len(current),
+                                  states=stop * m)
+        save_layer(directory, m, current)
+        previous = current
+        if observer is not None:
+            observer.phase_end('layer', m=m, states=current.size,
+                               bytes=current.nbytes)
+    # Return final distance including last hop from last city back to source.
+    return float((previous[0] + distances[other_cities, source]).min())
+
+
+def traveling_salesman_parallel(source, cities, num_cities, num_workers=None,
+                                chunk_size=2 ** 14, observer=None,
+                                dtype=np.float64):
+    '''
+    INPUT: Int, Numpy Array, Int, Int, Int, Observer, Numpy Dtype
+    OUTPUT: Float
+
+    Parallel version of traveling_salesman_layers. All of the subsets in a
+    layer are independent, so each layer is split into chunks of subsets,
+    which are computed by a pool of num_workers processes (by default, one per
+    CPU). The previous and current layers live in 2 shared memory buffers,
+    which the workers attach to once, and which swap roles from one layer to
+    the next. Each layer only starts once every chunk of the previous layer is
+    done, which acts as a barrier. Return the minimum tour distance. If an
+    observer is given, report each layer as a phase, and the progress through
+    its chunks, as they complete. As for traveling_salesman_layers, the layers
+    are float64 by default; float32 halves them but rounds the distances.
+    '''
+    if num_cities == 1:
+        return 0.0
+    distances = euclidean_distances(cities).astype(dtype)
+    other_cities = [i for i in range(num_cities) if i != source]
+    k = len(other_cities)
+    between = distances[np.ix_(other_cities, other_cities)]
+    binomials = binomial_table(k)
+    # Both buffers must be able to hold the largest layer.
+    max_cells = max(int(binomials[k, m]) * m for m in range(1, k + 1))
+    num_bytes = max_cells * np.dtype(dtype).itemsize
+    buffers = [shared_memory.SharedMemory(create=True, size=num_bytes)
+               for i in range(2)]
+    try:
+        # Base Case: layer 1 holds the distances from the source to each city.
+        shared_layer(buffers[1], 1, k, binomials, dtype)[:, 0] = \
+            distances[source, other_cities]
+        initargs = ([buffer.name for buffer in buffers], between, binomials)
+        with multiprocessing.Pool(num_workers, initializer=attach_layers,
+                                  initargs=initargs) as pool:
+            for m in range(2, k + 1):  # m = Subproblem (Subset) Size - 1
+                if observer is not None:
+                    observer.phase_start('layer', m=m)
+                size = int(binomials[k, m])
+                chunks = [(m, start, min(start + chunk_size, size))
+                          for start in range(0, size, chunk_size)]
+                done = 0
+                for subsets in pool.imap_unordered(compute_shared_layer,
+                                                   chunks):
+                    done += subsets
+                    if observer is not None:
+                        observer.progress('layer', done, size,
+                                          states=done * m)
+                if observer is not None:
+                    observer.phase_end('layer', m=m, states=size * m)
+        last = shared_layer(buffers[k % 2], k, k, binomials, dtype)
+        # Return final distance including last hop from last city to source.
+        return float((last[0] + distances[other_cities, source]).min())
+    finally:
+        for buffer in buffers:
+            buffer.close()
+            buffer.unlink()
+
+
+def attach_layers(names, between, binomials):
+    '''
+    INPUT: List, Numpy Array, Numpy Array
+    OUTPUT: None
+
+    Worker initializer: attach to the 2 shared memory buffers of the layers,
+    and keep the distances between cities and the binomial coefficients.
+    '''
+    SHARED_LAYERS['buffers'] = [shared_memory.SharedMemory(name=name)
+                                for name in names]
+    SHARED_LAYERS['between'] = between
+    SHARED_LAYERS['binomials'] = binomials
+
+
+def compute_shared_layer(chunk):
+    '''
+    INPUT: Tuple
+    OUTPUT: Int
+
+    Worker task: compute the subsets with ranks start to stop of layer m, from
+    layer m - 1. Layer m is stored in buffer (m % 2), so the buffers alternate.
+    The layers have the same dtype as the distances between cities. Return the
+    number of subsets computed.
+    '''
+    m, start, stop = chunk
+    buffers = SHARED_LAYERS['buffers']
+    between, binomials = SHARED_LAYERS['between'], SHARED_LAYERS['binomials']
+    k = len(between)
+    previous = shared_layer(buffers[(m - 1) % 2], m - 1, k, binomials,
+                            between.dtype)
+    current = shared_layer(buffers[m % 2], m, k, binomials, between.dtype)
+    compute_layer(previous, current, start, stop, between, binomials)
+    return stop - start
+
+
+def shared_layer(buffer, m, k, binomials, dtype=np.float64):
+    '''
+    INPUT: SharedMemory, Int, Int, Numpy Array, Numpy Dtype
+    OUTPUT: Numpy Array
+
+    Return layer m, of shape (C(k, m), m), as a view of the shared buffer.
+    '''
+    shape = (int(binomials[k, m]), m)
+    return np.ndarray(shape, dtype=dtype, buffer=buffer.buf)
+
+
+def compute_layer(previous, current, start, stop, between, binomials):
+    '''
+    INPUT: Numpy Array, Numpy Array, Int, Int, Numpy Array, Numpy Array
+    OUTPUT: None
+
+    Compute the subsets with ranks start to stop of the current layer (m), from
+    the previous layer (m - 1). For each position p, with city j = S[p]:
+    A[S, j] = min_[k in S, k ≠ j] { A[S - j, k] + c[k, j] }
+    '''
+    m, k = current.shape[1], len(between)
+    elements = unrank_subsets(np.arange(start, stop), m, k, binomials)
+    for p in range(m):
+        j = elements[:, p]
+        rest = np.delete(elements, p, axis=1)
+        candidates = previous[rank_subsets(rest, binomials)]
+        candidates += between[rest, j[:, np.newaxis]]
+        current[start:stop, p] = candidates.min(axis=1)
+
+
+def binomial_table(k):
+    '''
+    INPUT: Int
+    OUTPUT: Numpy Array
+
+    Return the table of binomial coefficients C(n, r), for n and r up to k.
+    '''
+    binomials = np.zeros((k + 1, k + 1), dtype=np.int64)
+    binomials[:, 0] = 1
+    for n in range(1, k + 1):
+        binomials[n, 1:] = binomials[n - 1, 1:] + binomials[n - 1, :-1]
+    return binomials
+
+
+def rank_subsets(elements, binomials):
+    '''
+    INPUT: Numpy Array, Numpy Array
+    OUTPUT: Numpy Array
+
+    Given subsets as rows of their elements, in increasing order, return their
+    ranks in the combinatorial number system: sum_i C(element_i, i + 1). The
+    ranks of all subsets of size m are exactly 0 to C(k, m) - 1.
+    '''
+    ranks = np.zeros(len(elements), dtype=np.int64)
+    for i in range(elements.shape[1]):
+        ranks += binomials[elements[:, i], i + 1]
+    return ranks
+
+
+def unrank_subsets(ranks, m, k, binomials):
+    '''
+    INPUT: Numpy Array, Int, Int, Numpy Array
+    OUTPUT: Numpy Array
+
+    Inverse of rank_subsets: return the subsets of size m (of cities 0 to
+    k - 1) with the given ranks, as rows of their elements in increasing order.
+    Greedily, from the largest city down, take each city c for which C(c, i)
+    still fits in the remaining rank, where i is the number of cities left.
+    '''
+    ranks = ranks.astype(np.int64)
+    elements = np.empty((len(ranks), m), dtype=np.int64)
+    remaining = np.full(len(ranks), m)
+    for c in range(k - 1, -1, -1):
+        take = (remaining > 0) & (ranks >= binomials[c, remaining])
+        ranks[take] -= binomials[c, remaining[take]]
+        remaining[take] -= 1
+        elements[take, remaining[take]] = c
+    return elements
+
+
+def new_layer(directory, m, shape, max_bytes, dtype=np.float64):
+    '''
+    INPUT: String, Int, Tuple, Int, Numpy Dtype
+    OUTPUT: Numpy Array
+
+    Allocate layer m in RAM or, if it is larger than max_bytes, as a memory-
+    mapped (partial) file in the given directory, which must then be given.
+    '''
+    num_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if max_bytes is None or num_bytes <= max_bytes:
+        return np.empty(shape, dtype=dtype)
+    if directory is None:
+        raise ValueError('Layer {} needs {} bytes; give a directory to spill '
+                         'it to'.format(m, num_bytes))
+    return np.lib.format.open_memmap(layer_path(directory, m, partial=True),
+                                     mode='w+', dtype=dtype, shape=shape)
+
+
+def save_layer(directory, m, layer):
+    '''
+    INPUT: String, Int, Numpy Array
+    OUTPUT: None
+
+    Save the completed layer m as a checkpoint in the given directory (if any),
+    then delete the checkpoint of layer m - 1, which is no longer needed. The
+    file is renamed into place only once it is complete, so a run killed part
+    way through a layer resumes from the previous one.
+    '''
+    if directory is None:
+        return
+    partial = layer_path(directory, m, partial=True)
+    if isinstance(layer, np.memmap):
+        layer.flush()
+    else:
+        np.save(partial, layer)
+    os.replace(partial, layer_path(directory, m))
+    if os.path.exists(layer_path(directory, m - 1)):
+        os.remove(layer_path(directory, m - 1))
+
+
+def load_last_layer(directory, k, binomials, fingerprint, observer=None):
+    '''
+    INPUT: String, Int, Numpy Array, String, Observer
+    OUTPUT: Int, None or Numpy Array
+
+    Return the last completed layer saved in the given directory, and its
+    number, memory-mapped (read-only). Return (0, None) if there is none, or
+    if its shape does not match an instance with k (non-source) cities. The
+    layers are only resumed if the directory holds the same fingerprint (see
+    instance_fingerprint); otherwise, raise a ValueError, rather than return
+    the tour of another instance. If there are no layers yet, the fingerprint
+    is saved in the directory, for later calls. If an observer is given, tell
+    it which layer is resumed.
+    '''
+    if directory is None:
+        return 0, None
+    fingerprint_path = os.path.join(directory, 'instance.txt')
+    layers = [int(os.path.basename(path)[6:-4]) for path in
+              glob.glob(os.path.join(directory, 'layer_[0-9]*[0-9].npy'))]
+    if not layers:
+        with open(fingerprint_path, 'w') as f:
+            f.write(fingerprint)
+        return 0, None
+    saved = None
+    if os.path.exists(fingerprint_path):
+        with open(fingerprint_path) as f:
+            saved = f.read().strip()
+    if saved != fingerprint:
+        raise ValueError('The layers in {} were saved for another instance; '
+                         'give a new directory'.format(directory))
+    m = max(layers)
+    layer = np.load(layer_path(directory, m), mmap_mode='r')
+    if m > k or layer.shape != (binomials[k, m], m):
+        return 0, None
+    if observer is not None:
+        observer.message('layer', 'Resuming From Iteration {}'.format(m), m=m)
+    return m, layer
+
+
+def instance_fingerprint(source, distances):
+    '''
+    INPUT: Int, Numpy Array
+    OUTPUT: String
+
+    Return a fingerprint of a TSP instance: the SHA-256 hash of the source
+    city, the number of cities, and the distance matrix (with its dtype).
+    '''
+    digest = hashlib.sha256()
+    digest.update('{} {} {}'.format(source, len(distances),
+                                    distances.dtype.str).encode())
+    digest.update(np.ascontiguousarray(distances).tobytes())
+    return digest.hexdigest()
+
+
+def layer_path(directory, m, partial=False):
+    '''
+    INPUT: String, Int, Boolean
+    OUTPUT: String
+
+    Return the path of the (partial or completed) layer m checkpoint file.
+    '''
+    suffix = '.partial.npy' if partial else '.npy'
+    return os.path.join(directory, 'layer_{:02}{}'.format(m, suffix))
+
+
 def binary_hash(subset):
     '''
     INPUT: List
@@ -77,9 +497,10 @@ def read_file(filename):
 if __name__ == '__main__':
     cities, num_cities = read_file('tsp.txt')
     time1 = time()
-    min_distance = traveling_salesman(0, cities, num_cities)
+    min_distance = traveling_salesman_bitmask(0, cities, num_cities,
+                                              ConsoleLog())
     time2 = time()
     print('\nMinimum Distance:\t{}'.format(min_distance))
     print('Time Required:\t{} Seconds'.format(time2 - time1))
     # Answer = 26442
-    # Time Required: 5400 Seconds = 90 Minutes
+    # Time Required (traveling_salesman): 5400 Seconds = 90 Minutes
@@ -0,0 +1,314 @@
+import numpy as np
+from sklearn.metrics.pairwise import euclidean_distances
+from traveling_salesman import (popcount_table, read_file,
+                                traveling_salesman_layers)
+from time import time
+
+
+def tsp_decomposition(cities, num_cities, max_exact=25, max_half=15):
+    '''
+    INPUT: Numpy Array, Int, Int, Int
+    OUTPUT: Float, Float, String
+
+    Front-end for the exact TSP solvers. First, find a fast heuristic tour
+    (nearest neighbour, improved with 2-opt and Or-opt), as an upper bound.
+    Then, if the cities split into 2 groups of at most max_half cities, solve
+    both halves exactly, joined by 2 bridging edges; if the split tour can be
+    proven optimal, return it. Only 2-way splits are tried: the bound that
+    proves them (see crossing_lower_bound) only covers tours between 2 groups,
+    and is too weak on some instances (e.g. tsp.txt, where the split tour is
+    optimal, but not proven). Otherwise, if there are at most max_exact
+    cities, run the exact (Held-Karp) solver on all of them, in float64.
+    Failing that, return the best tour found so far. Return the minimum
+    distance found, the distance of the heuristic tour, and the method used
+    ('split', 'exact' or 'heuristic').
+    '''
+    distances = euclidean_distances(cities)
+    tour = heuristic_tour(distances)
+    upper_bound = tour_length(tour, distances)
+    best = upper_bound
+    split = split_cities(distances, max_half)
+    if split is not None:
+        group_1, group_2 = split
+        split_distance = split_tour_length(distances, group_1, group_2)
+        best = min(best, split_distance)
+        if split_distance <= crossing_lower_bound(distances, group_1, group_2):
+            return split_distance, upper_bound, 'split'
+    if num_cities <= max_exact:
+        exact = traveling_salesman_layers(0, cities, num_cities)
+        return exact, upper_bound, 'exact'
+    return best, upper_bound, 'heuristic'
+
+
+def heuristic_tour(distances):
+    '''
+    INPUT: Numpy Array
+    OUTPUT: List
+
+    Build a tour with the nearest neighbour heuristic, starting from city 0,
+    then improve it with 2-opt and Or-opt moves until neither finds a shorter
+    tour. Return the tour, as a list of cities (without repeating the first).
+    '''
+    tour = nearest_neighbour_tour(distances)
+    improved = True
+    while improved:
+        tour, improved_1 = two_opt(tour, distances)
+        tour, improved_2 = or_opt(tour, distances)
+        improved = improved_1 or improved_2
+    return tour
+
+
+def nearest_neighbour_tour(distances):
+    '''
+    INPUT: Numpy Array
+    OUTPUT: List
+
+    Starting from city 0, repeatedly travel to the closest unvisited city.
+    '''
+    num_cities = len(distances)
+    visited = np.zeros(num_cities, dtype=bool)
+    tour = [0]
+    visited[0] = True
+    for i in range(num_cities - 1):
+        remaining = np.where(visited, np.inf, distances[tour[-1]])
+        city = int(np.argmin(remaining))
+        tour.append(city)
+        visited[city] = True
+    return tour
+
+
+def two_opt(tour, distances):
+    '''
+    INPUT: List, Numpy Array
+    OUTPUT: List, Boolean
+
+    Repeatedly replace 2 edges (a, b) and (c, d) of the tour with (a, c) and
+    (b, d), reversing the path from b to c, whenever that shortens the tour.
+    For each edge (a, b), the gains of all of the edges (c, d) are computed at
+    once. Return the tour, and whether it was improved at all.
+    '''
+    tour = np.array(tour)
+    n = len(tour)
+    improved = False
+    improving = n > 3
+    while improving:
+        improving = False
+        for i in range(n - 2):
+            a, b = tour[i], tour[i + 1]
+            c, d = tour[i + 2:], np.roll(tour, -1)[i + 2:]
+            # Edges that share a city with (a, b) cannot be exchanged with it.
+            if i == 0:
+                c, d = c[:-1], d[:-1]
+            gains = (distances[a, b] + distances[c, d]
+                     - distances[a, c] - distances[b, d])
+            if len(gains) and gains.max() > 1e-9:
+                j = i + 2 + int(np.argmax(gains))
+                tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1]
+                improving = improved = True
+    return tour.tolist(), improved
+
+
+def or_opt(tour, distances, max_segment=3):
+    '''
+    INPUT: List, Numpy Array, Int
+    OUTPUT: List, Boolean
+
+    Repeatedly move a segment of 1 to max_segment consecutive cities of the
+    tour elsewhere, possibly reversed, whenever that shortens the tour. For
+    each segment, the costs of all insertion points are computed at once.
+    Return the tour, and whether it was improved at all.
+    '''
+    n = len(tour)
+    improved = False
+    improving = n > max_segment + 2
+    while improving:
+        improving = False
+        for length in range(1, max_segment + 1):
+            for i in range(n):
+                # Rotate the tour so that the segment starts at position 1.
+                rotated = np.roll(tour, 1 - i)
+                prev, segment = rotated[0], rotated[1:length + 1]
+                # The rest of the tour, as a path from after the segment back
+                # to before it, once the segment has been removed.
+                rest = np.append(rotated[length + 1:], prev)
+                first, last, after = segment[0], segment[-1], rest[0]
+                removal = (distances[prev, first] + distances[last, after]
+                           - distances[prev, after])
+                # Insert between c and d, for each edge (c, d) of the rest.
+                c, d = rest[:-1], rest[1:]
+                forward = distances[c, first] + distances[last, d]
+                backward = distances[c, last] + distances[first, d]
+                insertion = np.minimum(forward, backward) - distances[c, d]
+                if removal - insertion.min() > 1e-9:
+                    k = int(np.argmin(insertion))
+                    if backward[k] < forward[k]:
+                        segment = segment[::-1]
+                    tour = np.concatenate((rest[:k + 1], segment,
+                                           rest[k + 1:])).tolist()
+                    improving = improved = True
+    return tour, improved
+
+
+def tour_length(tour, distances):
+    '''
+    INPUT: List, Numpy Array
+    OUTPUT: Float
+
+    Return the total distance of the tour, including the hop back to the start.
+    '''
+    return float(distances[tour, np.roll(tour, -1)].sum())
+
+
+def split_cities(distances, max_half):
+    '''
+    INPUT: Numpy Array, Int
+    OUTPUT: None or Tuple
+
+    Split the cities into 2 groups, by removing an edge of the MST (minimum
+    spanning tree). Of the edges that leave both groups with 2 to max_half
+    cities, remove the longest, so the groups are as far apart as possible.
+    Return the 2 groups, as lists of cities, or 'None' if there is no edge.
+    '''
+    num_cities = len(distances)
+    parents = minimum_spanning_tree(distances)
+    children = [[] for i in range(num_cities)]
+    for city in range(1, num_cities):
+        children[parents[city]].append(city)
+    best, best_length = None, -1
+    for city in range(1, num_cities):
+        subtree = subtree_cities(children, city)
+        if 2 <= len(subtree) <= max_half and \
+                2 <= num_cities - len(subtree) <= max_half:
+            length = distances[city, parents[city]]
+            if length > best_length:
+                best, best_length = subtree, length
+    if best is None:
+        return None
+    group = set(best)
+    return best, [city for city in range(num_cities) if city not in group]
+
+
+def minimum_spanning_tree(distances):
+    '''
+    INPUT: Numpy Array
+    OUTPUT: List
+
+    Use Prim's algorithm, over the dense distance matrix, to build the MST of
+    the (complete) graph of cities in O(n ** 2) time. Return the parent of each
+    city in the tree rooted at city 0 (the root is its own parent).
+    '''
+    num_cities = len(distances)
+    in_tree = np.zeros(num_cities, dtype=bool)
+    closest = distances[0].copy()
+    parents = np.zeros(num_cities, dtype=int)
+    in_tree[0] = True
+    for i in range(num_cities - 1):
+        city = int(np.argmin(np.where(in_tree, np.inf, closest)))
+        in_tree[city] = True
+        closer = ~in_tree & (distances[city] < closest)
+        closest[closer] = distances[city, closer]
+        parents[closer] = city
+    return parents.tolist()
+
+
+def subtree_cities(children, root):
+    '''
+    INPUT: List, Int
+    OUTPUT: List
+
+    Return the cities in the subtree of the given root, using DFS.
+    '''
+    cities, stack = [], [root]
+    while stack:
+        city = stack.pop()
+        cities.append(city)
+        stack.extend(children[city])
+    return cities
+
+
+def split_tour_length(distances, group_1, group_2):
+    '''
+    INPUT: Numpy Array, List, List
+    OUTPUT: Float
+
+    Return the shortest tour that crosses between the 2 groups exactly twice:
+    a Hamiltonian path through group 1 from a1 to a2, an edge (a2, b1), a
+    Hamiltonian path through group 2 from b1 to b2, and an edge (b2, a1). The
+    minimum over the 4 endpoints is computed as 2 min-plus matrix products.
+    '''
+    paths_1 = hamiltonian_paths(distances[np.ix_(group_1, group_1)])
+    paths_2 = hamiltonian_paths(distances[np.ix_(group_2, group_2)])
+    bridges = distances[np.ix_(group_1, group_2)]
+    # Q[a1, b1] = min_a2 { P1[a1, a2] + c[a2, b1] }
+    Q = (paths_1[:, :, np.newaxis] + bridges[np.newaxis, :, :]).min(axis=1)
+    # R[a1, b2] = min_b1 { Q[a1, b1] + P2[b1, b2] }
+    R = (Q[:, :, np.newaxis] + paths_2[np.newaxis, :, :]).min(axis=1)
+    return float((R + bridges).min())
+
+
+def hamiltonian_paths(distances):
+    '''
+    INPUT: Numpy Array
+    OUTPUT: Numpy Array
+
+    Return the length of the shortest Hamiltonian path (visiting every city
+    once) between each pair of cities, using the Held-Karp recurrence for all
+    of the start cities at once: A[S, a, j] is the shortest path from a to j
+    that visits exactly the cities in S.
+    '''
+    k = len(distances)
+    A = np.full((2 ** k, k, k), np.inf)
+    A[2 ** np.arange(k), np.arange(k), np.arange(k)] = 0
+    popcounts = popcount_table(k)
+    for m in range(2, k + 1):
+        subsets = np.flatnonzero(popcounts == m)
+        for j in range(k):
+            # A[S, a, j] = min_[k in S, k ≠ j] { A[S - j, a, k] + c[k, j] }
+            with_j = subsets[(subsets >> j) & 1 == 1]
+            candidates = A[with_j ^ (1 << j)] + distances[:, j]
+            A[with_j, :, j] = candidates.min(axis=2)
+    return A[-1]
+
+
+def crossing_lower_bound(distances, group_1, group_2):
+    '''
+    INPUT: Numpy Array, List, List
+    OUTPUT: Float
+
+    Return a lower bound on any tour that crosses between the 2 groups more
+    than twice. If it crosses 2c times (c >= 2), the 2c crossing edges are
+    distinct, so together they are at least as long as the 2c shortest edges
+    across the groups. The rest of the tour is c paths within each group,
+    which together are a spanning forest of the group with c trees: at least
+    as long as its MST, minus the (c - 1) longest MST edges. The split tour is
+    optimal if it is no longer than this bound.
+    '''
+    bridges = np.sort(distances[np.ix_(group_1, group_2)], axis=None)
+    edges = []
+    for group in [group_1, group_2]:
+        within = distances[np.ix_(group, group)]
+        parents = minimum_spanning_tree(within)
+        lengths = sorted((within[city, parents[city]]
+                          for city in range(1, len(group))), reverse=True)
+        edges.append(lengths)
+    max_crossings = min(len(group_1), len(group_2))
+    bound = np.inf
+    for c in range(2, max_crossings + 1):
+        forests = sum(sum(lengths[c - 1:]) for lengths in edges)
+        bound = min(bound, bridges[:2 * c].sum() + forests)
+    return bound
+
+
+if __name__ == '__main__':
+    cities, num_cities = read_file('tsp.txt')
+    time1 = time()
+    min_distance, upper_bound, method = tsp_decomposition(cities, num_cities)
+    time2 = time()
+    print('\nMethod:\t{}'.format(method))
+    print('Minimum Distance:\t{}'.format(min_distance))
+    print('Heuristic Distance:\t{}'.format(upper_bound))
+    if method != 'heuristic':
+        gap = (upper_bound - min_distance) / min_distance
+        print('Heuristic Gap:\t{:.2%}'.format(gap))
+    print('Time Required:\t{} Seconds'.format(time2 - time1))
+    # Answer = 26442
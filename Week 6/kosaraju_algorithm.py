@@ -1,20 +1,26 @@
 from collections import defaultdict
+from instrumentation import ConsoleLog
 
 
-def kosaraju_algorithm(forward, reverse):
+def kosaraju_algorithm(forward, reverse, observer=None):
     '''
-    INPUT: Dictionary, Dictionary
+    INPUT: Dictionary, Dictionary, Observer
     OUTPUT: DefaultDict, List
 
     Iterative, rather than recursive, implementation of Kosaraju's algorithm
     for finding the strongly connected components of a directed graph, because
     the recursive implementation flames out when dealing with large graphs.
+    If an observer is given, report both depth-first searches as phases.
     '''
+    if observer is not None:
+        observer.phase_start('reverse search')
     finished = visit_reverse(reverse)
-    print('Finished Reverse Depth-First Search\n')
-
+    if observer is not None:
+        observer.phase_end('reverse search', nodes=len(finished))
+        observer.phase_start('forward search')
     components = visit_forward(forward, finished)
-    print('Finished Forward Depth-First Search\n')
+    if observer is not None:
+        observer.phase_end('forward search', components=len(components))
 
     sizes = [len(nodes) for leader, nodes in components.items()]
     return components, sorted(sizes, reverse=True)
@@ -98,7 +104,7 @@ if __name__ == '__main__':
     print('Finished Reading File\n')
 
     # Run Kosaraju's algorithm on the graphs; return the SCCs and their sizes.
-    components, sizes = kosaraju_algorithm(forward, reverse)
+    components, sizes = kosaraju_algorithm(forward, reverse, ConsoleLog())
     n = min(5, len(sizes))
     print('# Of Strongly Connected Components:\t{}'.format(len(sizes)))
     print('Top {} Strongly Connected Components:\t{}'.format(n, sizes[:n]))
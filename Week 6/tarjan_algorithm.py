@@ -0,0 +1,111 @@
+import numpy as np
+from array import array
+from collections import defaultdict
+from graph_core import read_edges
+
+
+def tarjan_algorithm(graph):
+    '''
+    INPUT: CSRGraph
+    OUTPUT: DefaultDict, List
+
+    Same output as kosaraju_algorithm (the nodes of each SCC, by label, and the
+    sizes of the SCCs in decreasing order), but computed in a single pass over
+    the forward graph only; see strongly_connected_components.
+    '''
+    labels = strongly_connected_components(graph)
+    components = defaultdict(list)
+    for node, label in enumerate(labels.tolist()):
+        components[label].append(node)
+    sizes = np.bincount(labels).tolist() if len(labels) else []
+    return components, sorted(sizes, reverse=True)
+
+
+def strongly_connected_components(graph):
+    '''
+    INPUT: CSRGraph
+    OUTPUT: Numpy Array
+
+    Iterative implementation of Pearce's memory-efficient variant of Tarjan's
+    algorithm, which finds the SCCs (strongly connected components) of a
+    directed graph in a single DFS, without building the reverse graph. Each
+    node only needs one int32 (rindex) and one flag (root), plus an edge
+    cursor: the DFS stack holds each node once, and resumes from its cursor,
+    rather than pushing every neighbor. Active nodes hold their DFS index (or
+    the smallest index reachable from them) in rindex; as soon as an SCC is
+    complete, its nodes get a component number instead, counting down from
+    n - 1, which is larger than any active index.
+
+    Return the component label of each node. SCCs are completed in reverse
+    topological order, so the labels (0 to k - 1) are a topological order:
+    every edge between 2 SCCs goes from a smaller label to a larger one.
+    '''
+    n = graph.num_nodes
+    offsets, targets = compact(graph.offsets), compact(graph.targets)
+    # Position of the next edge to follow, out of each node.
+    cursors = compact(graph.offsets[:-1])
+    rindex = array('i', bytes(4 * n))
+    root = bytearray(n)
+    calls = []  # DFS stack, of nodes whose edges are still being followed.
+    stack = []  # Visited nodes that do not root an SCC, awaiting their root.
+    index, component = 1, n - 1
+    for start in range(n):
+        if rindex[start]:
+            continue
+        rindex[start], root[start] = index, 1
+        index += 1
+        calls.append(start)
+        while calls:
+            node = calls[-1]
+            edge = cursors[node]
+            if edge < offsets[node + 1]:
+                cursors[node] = edge + 1
+                neighbor = targets[edge]
+                if not rindex[neighbor]:
+                    rindex[neighbor], root[neighbor] = index, 1
+                    index += 1
+                    calls.append(neighbor)
+                elif rindex[neighbor] < rindex[node]:
+                    rindex[node], root[node] = rindex[neighbor], 0
+                continue
+            # All of the node's edges have been followed: finish the node.
+            calls.pop()
+            if root[node]:
+                # Pop the rest of the node's SCC, and give it a component.
+                index -= 1
+                while stack and rindex[node] <= rindex[stack[-1]]:
+                    rindex[stack.pop()] = component
+                    index -= 1
+                rindex[node] = component
+                component -= 1
+            else:
+                stack.append(node)
+            if calls:
+                parent = calls[-1]
+                if rindex[node] < rindex[parent]:
+                    rindex[parent], root[parent] = rindex[node], 0
+    return np.frombuffer(rindex, dtype=np.int32) - np.int32(component + 1)
+
+
+def compact(values):
+    '''
+    INPUT: Numpy Array
+    OUTPUT: Array
+
+    Copy the (integer) NumPy array into a compact Python array of the same
+    item size, which is much faster than NumPy for one item at a time.
+    '''
+    typecode = 'i' if values.dtype.itemsize == 4 else 'q'
+    return array(typecode, np.ascontiguousarray(values).tobytes())
+
+
+if __name__ == '__main__':
+    # Each line of the file is an edge, given by its tail and its head.
+    graph = read_edges('SCC.txt', header=False, weighted=False, cache=True)
+    print('Finished Reading File\n')
+
+    # Run Tarjan's algorithm on the graph; return the SCCs and their sizes.
+    components, sizes = tarjan_algorithm(graph)
+    n = min(5, len(sizes))
+    print('# Of Strongly Connected Components:\t{}'.format(len(sizes)))
+    print('Top {} Strongly Connected Components:\t{}'.format(n, sizes[:n]))
@@ -1,17 +1,22 @@
+import numpy as np
 from kosaraju_algorithm import kosaraju_algorithm
+from tarjan_algorithm import strongly_connected_components
 from collections import defaultdict
+from graph_core import CSRGraph, read_clauses
+from instrumentation import ConsoleLog
 
 
-def two_sat(n, forward, reverse):
+def two_sat(n, forward, reverse, observer=None):
     '''
-    INPUT: Int, DefaultDict, DefaultDict
+    INPUT: Int, DefaultDict, DefaultDict, Observer
     OUTPUT: Boolean
 
     Compute the SCCs (strongly connected components) for the given graph. If a
     node and its complement are in the same SCC, then return False (i.e., the
     conditions of the 2SAT problem are not satisfiable). Elsewise, return True.
+    The observer, if any, is passed on to kosaraju_algorithm.
     '''
-    components, sizes = kosaraju_algorithm(forward, reverse)
+    components, sizes = kosaraju_algorithm(forward, reverse, observer)
     for leader in components:
         nodes = set(components[leader])
         for node in nodes:
@@ -20,6 +25,247 @@ def two_sat(n, forward, reverse):
     return True
 
 
+def two_sat_assignment(n, clauses, preprocess=False, observer=None):
+    '''
+    INPUT: Int, Numpy Array, Boolean, Observer
+    OUTPUT: None or Numpy Array
+
+    Solve the 2SAT problem for n variables and an (m x 2) array of clauses of
+    signed literals. Compute the SCCs of the implication graph in a single pass
+    (see implication_graph and strongly_connected_components). If a literal
+    and its complement are in the same SCC, return 'None'. Otherwise, return a
+    satisfying assignment: a variable is True if its positive literal's SCC
+    comes after its negative literal's SCC, in topological order.
+
+    If preprocess is True, first simplify the clauses (see preprocess_clauses),
+    and only build the implication graph of the variables that remain,
+    renumbered from 1. The observer, if any, receives a 'preprocess' phase,
+    which ends with how many variables and clauses remain, and how many units
+    and pure literals were set.
+    '''
+    if preprocess:
+        if observer is not None:
+            observer.phase_start('preprocess', variables=n,
+                                 clauses=len(clauses))
+        clauses, values, units, pure = preprocess_clauses(n, clauses)
+        variables = np.unique(np.abs(clauses)) if clauses is not None else []
+        if observer is not None:
+            observer.phase_end('preprocess', variables=len(variables),
+                               clauses=len(clauses)
+                               if clauses is not None else 0,
+                               units=units, pure=pure)
+        if clauses is None:
+            return None
+        renumbered = np.searchsorted(variables, np.abs(clauses)) + 1
+        remaining = two_sat_assignment(len(variables),
+                                       np.sign(clauses) * renumbered)
+        if remaining is None:
+            return None
+        # Variables that were set, or that no longer appear, keep their value.
+        values[variables - 1] = remaining
+        return values == 1
+    labels = strongly_connected_components(implication_graph(n, clauses))
+    positive, negative = labels[0::2], labels[1::2]
+    if np.any(positive == negative):
+        return None
+    return positive > negative
+
+
+def preprocess_clauses(n, clauses):
+    '''
+    INPUT: Int, Numpy Array
+    OUTPUT: None or Numpy Array, Numpy Array, Int, Int
+
+    Simplify the clauses before building the implication graph, keeping them
+    satisfiable if and only if they were. Drop duplicate clauses, and clauses
+    of a literal and its complement (always True). Then repeat, for all of the
+    clauses at once, until nothing changes:
+      - Drop the clauses that contain a True literal.
+      - A clause (x, x), or one whose other literal is False, is a unit: x must
+        be True. If both of a clause's literals are False, or if both x and -x
+        are units, the clauses are not satisfiable.
+      - If there are no units, set every pure literal True: a literal x such
+        that -x appears in no clause. This can only satisfy more clauses.
+
+    Return the remaining clauses (or 'None', if not satisfiable), the value of
+    each variable (1 for True, 0 for False, -1 if not set), and the number of
+    units and of pure literals set.
+    '''
+    literals = literal_index(np.asarray(clauses, dtype=np.int64)
+                             .reshape(-1, 2))
+    literals.sort(axis=1)
+    literals = np.unique(literals[literals[:, 0] ^ 1 != literals[:, 1]],
+                         axis=0)
+    values = np.full(n, -1, dtype=np.int8)
+    num_units = num_pure = 0
+    while len(literals):
+        # Value of each literal: 1 (True), 0 (False) or -1 (not set).
+        truth = values[literals >> 1]
+        truth = np.where(truth < 0, truth, truth ^ (literals & 1))
+        unsatisfied = ~(truth == 1).any(axis=1)
+        literals, truth = literals[unsatisfied], truth[unsatisfied]
+        false = truth == 0
+        if false.all(axis=1).any():
+            return None, values, num_units, num_pure
+        units = np.concatenate((literals[false[:, 0], 1],
+                                literals[false[:, 1], 0],
+                                literals[literals[:, 0] == literals[:, 1], 0]))
+        if len(units):
+            units = np.unique(units)
+            # Sorted, a literal and its complement would be adjacent.
+            if np.any(units[:-1] ^ 1 == units[1:]):
+                return None, values, num_units, num_pure
+            num_units += len(units)
+        else:
+            counts = np.bincount(literals.ravel(), minlength=2 * n)
+            units = np.flatnonzero((counts > 0) &
+                                   (counts.reshape(-1, 2)[:, ::-1]
+                                    .ravel() == 0))
+            if not len(units):
+                break
+            num_pure += len(units)
+        values[units >> 1] = 1 - (units & 1)
+    signed = (literals >> 1) + 1
+    return np.where(literals & 1, -signed, signed), values, num_units, num_pure
+
+
+def implication_graph(n, clauses):
+    '''
+    INPUT: Int, Numpy Array
+    OUTPUT: CSRGraph
+
+    Build the implication graph of the clauses, over 2n dense literal indices
+    (see literal_index). Each clause (x1, x2) results in 2 directed edges:
+    (-x1, x2) and (-x2, x1).
+    '''
+    clauses = np.asarray(clauses, dtype=np.int64).reshape(-1, 2)
+    first, second = literal_index(clauses[:, 0]), literal_index(clauses[:, 1])
+    # The complement of a literal index is that index XOR 1.
+    tails = np.concatenate((first ^ 1, second ^ 1))
+    heads = np.concatenate((second, first))
+    return CSRGraph.from_edges(tails, heads, None, 2 * n)
+
+
+def literal_index(literals):
+    '''
+    INPUT: Numpy Array or Int
+    OUTPUT: Numpy Array or Int
+
+    Map the signed (1-indexed) literals v and -v to the dense indices 2(v - 1)
+    and 2(v - 1) + 1, respectively, so that a literal's complement is its index
+    XOR 1.
+    '''
+    return 2 * (abs(literals) - 1) + (literals < 0)
+
+
+class TwoSat(object):
+    '''
+    Incremental 2SAT solver. The clauses given up front are solved once, with
+    two_sat_assignment. Each clause added afterwards is checked against the
+    current assignment: if it is already satisfied, nothing changes. Otherwise,
+    for each of its literals in turn, follow the implication graph from it,
+    and if the literals reached include no complementary pair, set all of them
+    to True. That cannot break any clause (x1, x2): if x1 becomes False, then
+    -x1 was reached, and so was x2, through the edge (-x1, x2). The search
+    stops at literals that are already True (see implied): the clauses are
+    satisfied, so everything they imply is already True too, and only stays
+    so if their complements are not reached. If neither literal can be set,
+    both are implied False by the other clauses, so the clauses are not
+    satisfiable (and never will be again).
+    '''
+
+    def __init__(self, n, clauses=()):
+        '''
+        INPUT: Int, Numpy Array
+        OUTPUT: None
+        '''
+        self.n = n
+        graph = implication_graph(n, clauses)
+        # Implications from each literal index, as lists that can grow.
+        offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+        self.implications = [targets[offsets[i]:offsets[i + 1]]
+                             for i in range(2 * n)]
+        assignment = two_sat_assignment(n, clauses)
+        self.satisfiable = assignment is not None
+        self.values = bytearray(assignment.tobytes() if self.satisfiable
+                                else n)
+
+    @property
+    def assignment(self):
+        '''
+        INPUT: None
+        OUTPUT: None or Numpy Array
+
+        Return a satisfying assignment of the variables, or 'None'.
+        '''
+        if not self.satisfiable:
+            return None
+        return np.frombuffer(bytes(self.values), dtype=bool).copy()
+
+    def is_true(self, literal):
+        '''
+        INPUT: Int
+        OUTPUT: Boolean
+
+        Return whether the literal (a dense index) is True under the current
+        assignment.
+        '''
+        return self.values[literal >> 1] != (literal & 1)
+
+    def add_clause(self, x1, x2):
+        '''
+        INPUT: Int, Int
+        OUTPUT: Boolean
+
+        Add the clause (x1, x2) of signed literals, and return whether the
+        clauses are still satisfiable.
+        '''
+        first, second = literal_index(x1), literal_index(x2)
+        self.implications[first ^ 1].append(second)
+        self.implications[second ^ 1].append(first)
+        if not self.satisfiable or \
+                self.is_true(first) or self.is_true(second):
+            return self.satisfiable
+        for literal in (first, second):
+            implied = self.implied(literal)
+            if implied is not None:
+                for implied_literal in implied:
+                    self.values[implied_literal >> 1] = \
+                        1 - (implied_literal & 1)
+                return True
+        self.satisfiable = False
+        return False
+
+    def implied(self, literal):
+        '''
+        INPUT: Int
+        OUTPUT: None or Set
+
+        Return the set of literals reachable from the given literal in the
+        implication graph (including itself), without going past literals that
+        are already True, or 'None' if the literal implies both a literal and
+        its complement. Every literal reached is False (its complement is
+        True), so that happens when the search reaches one of them and stops
+        at the other.
+        '''
+        reached = {literal}
+        # True literals at which the search stopped.
+        stopped = set()
+        stack = [literal]
+        while stack:
+            for neighbor in self.implications[stack.pop()]:
+                if neighbor in reached or neighbor in stopped:
+                    continue
+                if neighbor ^ 1 in reached or neighbor ^ 1 in stopped:
+                    return None
+                if self.is_true(neighbor):
+                    stopped.add(neighbor)
+                else:
+                    reached.add(neighbor)
+                    stack.append(neighbor)
+        return reached
+
+
 def read_file(filename):
     '''
     INPUT: String
@@ -50,10 +296,15 @@ if __name__ == '__main__':
     divider = '\n{}\n'.format('-' * 60)
     filenames = ['2sat{}.txt'.format(i + 1) for i in range(6)]
     satisfied = []
+    # Simplify the clauses before building each implication graph.
+    preprocess = True
 
     for filename in filenames:
-        n, forward, reverse = read_file(filename)
-        s = two_sat(n, forward, reverse)
+        n, clauses = read_clauses(filename, cache=True)
+        print('Finished Reading {}\n'.format(filename))
+        print('Variables:\t{}\tClauses:\t{}'.format(n, len(clauses)))
+        s = two_sat_assignment(n, clauses, preprocess,
+                               ConsoleLog()) is not None
         print(s)
         satisfied.append(s)
         print(divider)
@@ -0,0 +1,6 @@
+from batch.cache import ResultCache, file_hash
+from batch.driver import solve_file, solve_files
+from batch.solvers import SOLVERS
+
+__all__ = ['ResultCache', 'SOLVERS', 'file_hash', 'solve_file',
+           'solve_files']
@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import sys
+from batch import SOLVERS, solve_files
+
+
+def parse_arguments(arguments):
+    '''
+    INPUT: List
+    OUTPUT: Namespace
+
+    Parse the command-line arguments of the batch driver.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m batch',
+        description='Solve many instance files with one solver, in parallel, '
+                    'reusing the cached answers of unchanged files.')
+    parser.add_argument('solver', help='solver to run, of: {}'
+                                       .format(', '.join(SOLVERS)))
+    parser.add_argument('files', nargs='+', help='instance files to solve')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: one per '
+                             'CPU)')
+    parser.add_argument('--cache-dir', default='.batch_cache',
+                        help='directory of cached answers (default: '
+                             '%(default)s)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='neither read nor write cached answers')
+    parser.add_argument('--json', action='store_true',
+                        help='print each result as a line of JSON')
+    options = parser.parse_args(arguments)
+    if options.solver not in SOLVERS:
+        parser.error('unknown solver: {}'.format(options.solver))
+    if options.workers is not None and options.workers < 1:
+        parser.error('--workers must be at least 1')
+    for filename in options.files:
+        if not os.path.isfile(filename):
+            parser.error('no such file: {}'.format(filename))
+    return options
+
+
+def main(arguments):
+    '''
+    INPUT: List
+    OUTPUT: Int
+
+    Solve the given files, printing each result as soon as it is done. Return
+    the exit status: 1 if any file failed to solve, 0 otherwise.
+    '''
+    options = parse_arguments(arguments)
+    cache_dir = None if options.no_cache else options.cache_dir
+    failed = False
+    for filename, status, answer, seconds in solve_files(
+            options.solver, options.files, options.workers, cache_dir):
+        failed = failed or status == 'error'
+        if options.json:
+            print(json.dumps({'file': filename, 'status': status,
+                              'answer': answer, 'seconds': seconds}),
+                  flush=True)
+        else:
+            print('{}\t{:<6}\tAnswer: {}\tTime: {:.3f} Seconds'
+                  .format(filename, status.title(), answer, seconds),
+                  flush=True)
+    return int(failed)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
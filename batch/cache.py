@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+
+
+def file_hash(filename, block_size=2 ** 20):
+    '''
+    INPUT: String, Int
+    OUTPUT: String
+
+    Return the SHA-256 hash of the file's content, read a block at a time.
+    '''
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    '''
+    Cache of answers on disk, one small JSON file per answer, keyed by the
+    hash of the input file's content together with the solver's name and
+    version. Renaming or touching an input does not invalidate its answer, but
+    changing its content or bumping the solver's version does.
+    '''
+
+    def __init__(self, directory):
+        '''
+        INPUT: String
+        OUTPUT: None
+        '''
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, content_hash, solver, version):
+        '''
+        INPUT: String, String, String
+        OUTPUT: String
+
+        Return the path of the cache file for the given key.
+        '''
+        key = '\0'.join((content_hash, solver, version)).encode()
+        return os.path.join(self.directory,
+                            hashlib.sha256(key).hexdigest() + '.json')
+
+    def get(self, content_hash, solver, version):
+        '''
+        INPUT: String, String, String
+        OUTPUT: None or Dictionary
+
+        Return the cached entry (the answer, and the seconds it took to solve)
+        for the given key, or 'None' if there is none.
+        '''
+        path = self.path(content_hash, solver, version)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def put(self, content_hash, solver, version, answer, seconds):
+        '''
+        INPUT: String, String, String, Object, Float
+        OUTPUT: None
+
+        Cache the answer for the given key. The entry is written to a temporary
+        file first, then renamed into place, so that concurrent runs never
+        read a partial entry.
+        '''
+        path = self.path(content_hash, solver, version)
+        partial = '{}.{}.partial'.format(path, os.getpid())
+        with open(partial, 'w') as f:
+            json.dump({'solver': solver, 'version': version,
+                       'answer': answer, 'seconds': seconds}, f)
+        os.replace(partial, path)
@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+from batch.cache import ResultCache, file_hash
+from batch.solvers import SOLVERS
+from contextlib import redirect_stdout
+from instrumentation import plain
+from time import time
+
+
+def solve_file(job):
+    '''
+    INPUT: Tuple
+    OUTPUT: Tuple
+
+    Solve one (solver name, file name, content hash) job, with anything the
+    solver prints discarded. Return the file name, its content hash, the
+    answer (or the error, as a string, if the solver raised one), whether the
+    solver raised an error, and the time it took (in seconds).
+    '''
+    solver, filename, content_hash = job
+    start = time()
+    try:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            answer = plain(SOLVERS[solver][1](filename))
+        failed = False
+    except Exception as error:
+        answer = '{}: {}'.format(type(error).__name__, error)
+        failed = True
+    return filename, content_hash, answer, failed, time() - start
+
+
+def solve_files(solver, filenames, num_workers=None, cache_dir=None):
+    '''
+    INPUT: String, List, Int, String
+    OUTPUT: Generator
+
+    Solve each of the given files with the named solver, in a pool of the
+    given number of worker processes (by default, one per CPU). Yield, for
+    each file, as soon as it is done: its name, its status ('cached', 'solved'
+    or 'error'), its answer (or error) and the time it took to solve (in
+    seconds; for a cached answer, the time it took when it was first solved).
+
+    If a cache directory is given, answers are cached there, keyed by the
+    hash of the file's content and the solver's name and version. Files
+    already in the cache are yielded first, without being solved again.
+    Errors are not cached, so that they are retried on the next run.
+    '''
+    version = SOLVERS[solver][0]
+    cache = ResultCache(cache_dir) if cache_dir is not None else None
+    jobs = []
+    for filename in filenames:
+        content_hash = file_hash(filename) if cache is not None else None
+        entry = cache.get(content_hash, solver, version) \
+            if cache is not None else None
+        if entry is not None:
+            yield filename, 'cached', entry['answer'], entry['seconds']
+        else:
+            jobs.append((solver, filename, content_hash))
+    if not jobs:
+        return
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(jobs))
+    if num_workers == 1:
+        # Not worth the overhead of a pool.
+        results = map(solve_file, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(num_workers)
+        # One job at a time, so that each result is yielded when it is done.
+        results = pool.imap_unordered(solve_file, jobs)
+    try:
+        for filename, content_hash, answer, failed, seconds in results:
+            if failed:
+                yield filename, 'error', answer, seconds
+                continue
+            if cache is not None:
+                cache.put(content_hash, solver, version, answer, seconds)
+            yield filename, 'solved', answer, seconds
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,145 @@
+from graph_core import read_clauses, read_edges, week_module
+
+# Each solver imports its week's module (see week_module) when it is called,
+# rather than here: some are slow to import, and a run answered entirely from
+# the cache should start at once.
+
+
+def solve_jobs_difference(filename):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the weighted completion time of the jobs, by difference.
+    '''
+    jobs = week_module('jobs_schedule')
+    weights, lengths = jobs.read_file(filename)
+    return jobs.jobs_schedule_numpy(weights, lengths, 0)
+
+
+def solve_jobs_ratio(filename):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the weighted completion time of the jobs, by exact ratio.
+    '''
+    jobs = week_module('jobs_schedule')
+    weights, lengths = jobs.read_file(filename)
+    return jobs.jobs_schedule_numpy(weights, lengths, 1, exact=True)
+
+
+def solve_mst(filename):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the cost of the minimum spanning forest of the edges.
+    '''
+    prim = week_module('prim_algorithm')
+    return prim.minimum_spanning_forest(read_edges(filename).undirected())[0]
+
+
+def solve_k_clustering(filename, k=4):
+    '''
+    INPUT: String, Int
+    OUTPUT: Int
+
+    Return the maximum spacing of a k-clustering of the edges.
+    '''
+    clustering = week_module('k_clustering')
+    distances, n = clustering.read_file(filename)
+    return clustering.k_clustering(k, distances, n)
+
+
+def solve_hamming(filename, min_distance=3):
+    '''
+    INPUT: String, Int
+    OUTPUT: Int
+
+    Return the number of clusters with at least the given spacing.
+    '''
+    hamming = week_module('hamming_clustering')
+    nodes, num_bits = hamming.read_file(filename)
+    return hamming.hamming_clustering_numpy(nodes, num_bits, min_distance)
+
+
+def solve_knapsack(filename):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the maximum value of the knapsack.
+    '''
+    knapsack = week_module('knapsack_algorithm')
+    items, size, n = knapsack.read_file(filename)
+    return knapsack.knapsack_sparse(items, size)[0]
+
+
+def solve_apsp(filename):
+    '''
+    INPUT: String
+    OUTPUT: None or Int
+
+    Return the shortest distance, or 'None' if there is a negative cycle.
+    '''
+    apsp = week_module('all_pairs_shortest_path')
+    graph, num_nodes, num_edges = apsp.read_file_csr(filename)
+    return apsp.all_pairs_shortest_path(graph, num_nodes)
+
+
+def solve_tsp(filename):
+    '''
+    INPUT: String
+    OUTPUT: Dictionary
+
+    Return the minimum tour distance, and the method that found it.
+    '''
+    tsp = week_module('traveling_salesman')
+    tsp_decomposition = week_module('tsp_decomposition')
+    cities, num_cities = tsp.read_file(filename)
+    distance, upper_bound, method = tsp_decomposition.tsp_decomposition(
+        cities, num_cities)
+    return {'distance': distance, 'method': method}
+
+
+def solve_two_sat(filename):
+    '''
+    INPUT: String
+    OUTPUT: Boolean
+
+    Return whether the clauses are satisfiable.
+    '''
+    two_sat = week_module('two_sat')
+    n, clauses = read_clauses(filename)
+    return two_sat.two_sat_assignment(n, clauses, True) is not None
+
+
+def solve_scc(filename):
+    '''
+    INPUT: String
+    OUTPUT: List
+
+    Return the sizes of the 5 largest strongly connected components.
+    '''
+    tarjan = week_module('tarjan_algorithm')
+    graph = read_edges(filename, header=False, weighted=False)
+    return tarjan.tarjan_algorithm(graph)[1][:5]
+
+
+# Each solver takes the name of an input file (in the format of its week's
+# assignment) and returns its answer. The version is part of the cache key:
+# bump it whenever a change to the solver (or to what it returns) should
+# invalidate the answers cached so far.
+SOLVERS = {
+    'jobs_difference': ('1', solve_jobs_difference),
+    'jobs_ratio': ('1', solve_jobs_ratio),
+    'mst': ('1', solve_mst),
+    'k_clustering': ('1', solve_k_clustering),
+    'hamming': ('1', solve_hamming),
+    'knapsack': ('1', solve_knapsack),
+    'apsp': ('1', solve_apsp),
+    'tsp': ('1', solve_tsp),
+    'two_sat': ('1', solve_two_sat),
+    'scc': ('1', solve_scc),
+}
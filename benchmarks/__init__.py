@@ -0,0 +1,11 @@
+from benchmarks.answers import ANSWERS, check_answers
+from benchmarks.cases import PROBLEMS, case_names
+from benchmarks.history import (find_changed_answers, find_regressions,
+                                load_history, save_history)
+from benchmarks.runner import (disagreements, measure, measure_isolated,
+                               run_suite)
+
+__all__ = ['ANSWERS', 'PROBLEMS', 'case_names', 'check_answers',
+           'disagreements', 'find_changed_answers', 'find_regressions',
+           'load_history', 'measure', 'measure_isolated', 'run_suite',
+           'save_history']
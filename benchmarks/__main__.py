@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+from benchmarks import (ANSWERS, PROBLEMS, case_names, check_answers,
+                        disagreements, find_changed_answers,
+                        find_regressions, load_history, run_suite,
+                        save_history)
+
+# By default, the history is kept next to the package (and out of git).
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'history.json')
+
+
+def parse_arguments(arguments):
+    '''
+    INPUT: List
+    OUTPUT: Namespace
+
+    Parse the command-line arguments of the benchmark suite.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark every solver engine on random instances, and '
+                    'check for regressions against the saved history.')
+    parser.add_argument('problems', nargs='*',
+                        help='problems to run, of: {} (default: all)'
+                             .format(', '.join(PROBLEMS)))
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='size of the random instances (default: 1)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the random instances (default: 0)')
+    parser.add_argument('--history', default=HISTORY,
+                        help='JSON history file (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='slowdown, as a fraction, that counts as a '
+                             'regression (default: %(default)s)')
+    parser.add_argument('--no-save', action='store_true',
+                        help='do not add this run to the history')
+    parser.add_argument('--answers', action='store_true',
+                        help='also check the known answers, on the real '
+                             'input files')
+    options = parser.parse_args(arguments)
+    for problem in options.problems:
+        if problem not in PROBLEMS:
+            parser.error('unknown problem: {}'.format(problem))
+    return options
+
+
+def main(arguments):
+    '''
+    INPUT: List
+    OUTPUT: Int
+
+    Run the benchmark suite, compare it with the history, and optionally
+    check the known answers. Return the exit status: 1 if any engines
+    disagree, any case regressed or changed its answer, or any known answer
+    is wrong; 0 otherwise.
+    '''
+    options = parse_arguments(arguments)
+    divider = '\n{}\n'.format('-' * 60)
+    failed = False
+
+    run = run_suite(case_names(options.problems or None), options.scale,
+                    options.seed)
+    print(divider)
+    for problem in disagreements(run['results']):
+        print('Engines Disagree:\t{}'.format(problem))
+        failed = True
+
+    history = load_history(options.history)
+    for name, answer, previous in find_changed_answers(history, run):
+        print('Answer Changed:\t{}\t{} (Was {})'
+              .format(name, answer, previous))
+        failed = True
+    for name, seconds, baseline in find_regressions(history, run,
+                                                    options.threshold):
+        print('Regression:\t{}\t{:.3f} Seconds (Baseline {:.3f})'
+              .format(name, seconds, baseline))
+        failed = True
+    if not options.no_save:
+        history.append(run)
+        save_history(options.history, history)
+
+    if options.answers:
+        print(divider)
+        for label, (status, value, expected, seconds) in \
+                check_answers(list(ANSWERS)).items():
+            print('{:<16}\t{:<8}\tAnswer: {}\tExpected: {}\t'
+                  'Time: {:.3f} Seconds'
+                  .format(label, status.title(), value, expected, seconds))
+            failed = failed or status == 'wrong'
+        print(divider)
+
+    print('Result:\t{}'.format('Failed' if failed else 'Passed'))
+    return int(failed)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,168 @@
+import os
+from contextlib import redirect_stdout
+from benchmarks.cases import (apsp, clustering, hamming, jobs, knapsack, prim,
+                              tsp, two_sat)
+from graph_core import WEEKS, read_clauses, read_edges
+from time import time
+
+
+def jobs_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the weighted completion time of the jobs, by difference.
+    '''
+    weights, lengths = jobs.read_file(os.path.join(directory, 'jobs.txt'))
+    return jobs.jobs_schedule_numpy(weights, lengths, 0)
+
+
+def prim_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the cost of the minimum spanning tree of edges.txt.
+    '''
+    graph = read_edges(os.path.join(directory, 'edges.txt')).undirected()
+    return prim.minimum_spanning_forest(graph)[0]
+
+
+def clustering_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the maximum spacing of a 4-clustering of clustering1.txt.
+    '''
+    filename = os.path.join(directory, 'clustering1.txt')
+    distances, n = clustering.read_file(filename)
+    return clustering.k_clustering(4, distances, n)
+
+
+def hamming_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the number of clusters with spacing of at least 3.
+    '''
+    filename = os.path.join(directory, 'clustering_big.txt')
+    nodes, num_bits = hamming.read_file(filename)
+    return hamming.hamming_clustering_numpy(nodes, num_bits, 3)
+
+
+def knapsack_small_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the maximum value of the small knapsack.
+    '''
+    filename = os.path.join(directory, 'knapsack1.txt')
+    items, size, n = knapsack.read_file(filename)
+    return knapsack.knapsack_numpy(items, size)
+
+
+def knapsack_big_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the maximum value of the big knapsack.
+    '''
+    filename = os.path.join(directory, 'knapsack_big.txt')
+    items, size, n = knapsack.read_file(filename)
+    return knapsack.knapsack_sparse(items, size)[0]
+
+
+def apsp_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: None or Int
+
+    Return the shortest distance in g1.txt to g3.txt, or 'None' if all of
+    them have a negative cycle.
+    '''
+    distances = []
+    for i in range(3):
+        filename = os.path.join(directory, 'g{}.txt'.format(i + 1))
+        graph, num_nodes, num_edges = apsp.read_file_csr(filename)
+        distance = apsp.all_pairs_shortest_path(graph, num_nodes)
+        if distance is not None:
+            distances.append(distance)
+    return min(distances) if distances else None
+
+
+def tsp_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the minimum tour distance of tsp.txt, rounded down.
+    '''
+    cities, num_cities = tsp.read_file(os.path.join(directory, 'tsp.txt'))
+    return int(tsp.traveling_salesman_bitmask(0, cities, num_cities))
+
+
+def two_sat_answer(directory):
+    '''
+    INPUT: String
+    OUTPUT: Int
+
+    Return the satisfiability of 2sat1.txt to 2sat6.txt, as 6 digits.
+    '''
+    satisfied = []
+    for i in range(6):
+        filename = os.path.join(directory, '2sat{}.txt'.format(i + 1))
+        n, clauses = read_clauses(filename)
+        s = two_sat.two_sat_assignment(n, clauses, True) is not None
+        satisfied.append(str(int(s)))
+    return int(''.join(satisfied))
+
+
+# The answers to the assignments, as given in each week's __main__ block: the
+# week, the input files, a function of the week's directory computing the
+# answer (with the fastest engine), and the expected answer.
+ANSWERS = {
+    'jobs': (1, ['jobs.txt'], jobs_answer, 69119377652),
+    'prim': (1, ['edges.txt'], prim_answer, -3612829),
+    'k_clustering': (2, ['clustering1.txt'], clustering_answer, 106),
+    'hamming': (2, ['clustering_big.txt'], hamming_answer, 6118),
+    'knapsack_small': (3, ['knapsack1.txt'], knapsack_small_answer, 2493893),
+    'knapsack_big': (3, ['knapsack_big.txt'], knapsack_big_answer, 4243395),
+    'apsp': (4, ['g1.txt', 'g2.txt', 'g3.txt'], apsp_answer, -19),
+    'tsp': (5, ['tsp.txt'], tsp_answer, 26442),
+    'two_sat': (6, ['2sat{}.txt'.format(i + 1) for i in range(6)],
+                two_sat_answer, 101100),
+}
+
+
+def check_answers(labels=None):
+    '''
+    INPUT: List
+    OUTPUT: Dictionary
+
+    Compute each of the given answers (by default, all of them) from the real
+    input files, with anything the solvers print discarded, and compare it
+    with the expected answer. Return, for each, its status ('ok', 'wrong', or
+    'skipped' if an input file is missing), the answer computed, the expected
+    answer, and the time it took (in seconds).
+    '''
+    if labels is None:
+        labels = list(ANSWERS)
+    results = {}
+    for label in labels:
+        week, filenames, answer, expected = ANSWERS[label]
+        directory = WEEKS[week - 1]
+        if not all(os.path.exists(os.path.join(directory, filename))
+                   for filename in filenames):
+            results[label] = ('skipped', None, expected, 0.0)
+            continue
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            time_0 = time()
+            value = answer(directory)
+            time_1 = time()
+        status = 'ok' if value == expected else 'wrong'
+        results[label] = (status, value, expected, time_1 - time_0)
+    return results
@@ -0,0 +1,275 @@
+import numpy as np
+from collections import defaultdict
+from graph_core import (random_bits, random_clauses, random_directed_graph,
+                        random_items, random_jobs, random_points,
+                        random_undirected_graph, week_module)
+
+apsp = week_module('all_pairs_shortest_path')
+hamming = week_module('hamming_clustering')
+jobs = week_module('jobs_schedule')
+clustering = week_module('k_clustering')
+knapsack = week_module('knapsack_algorithm')
+kosaraju = week_module('kosaraju_algorithm')
+prim = week_module('prim_algorithm')
+tarjan = week_module('tarjan_algorithm')
+tsp = week_module('traveling_salesman')
+tsp_decomposition = week_module('tsp_decomposition')
+two_sat = week_module('two_sat')
+
+
+def jobs_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Dictionary, Int
+
+    Random jobs, both as arrays and as the list of tuples the original
+    functions take. Also return the number of jobs.
+    '''
+    weights, lengths = random_jobs(int(200000 * scale), seed)
+    instance = {'weights': weights, 'lengths': lengths,
+                'jobs': list(zip(weights.tolist(), lengths.tolist()))}
+    return instance, len(weights)
+
+
+def jobs_stream_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Dictionary, Int
+
+    Fewer random jobs, for JobScheduler, which adds them one at a time.
+    '''
+    weights, lengths = random_jobs(int(20000 * scale), seed)
+    instance = {'weights': weights, 'lengths': lengths,
+                'jobs': list(zip(weights.tolist(), lengths.tolist()))}
+    return instance, len(weights)
+
+
+def stream_jobs(instance, key):
+    '''
+    INPUT: Dictionary, Function
+    OUTPUT: Int
+
+    Add the jobs to a JobScheduler one at a time, and return its total.
+    '''
+    scheduler = jobs.JobScheduler(key)
+    for weight, length in instance['jobs']:
+        scheduler.add(weight, length)
+    return scheduler.total
+
+
+def mst_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: CSRGraph, Int
+
+    A random connected, undirected graph, and its number of edges.
+    '''
+    graph = random_undirected_graph(int(20000 * scale), int(100000 * scale),
+                                    seed)
+    return graph, graph.num_edges // 2
+
+
+def clustering_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Dictionary, Int
+
+    A random cloud of points, and the complete graph of their (Euclidean)
+    distances, as (distance, (node1, node2)) tuples over 1-indexed nodes, as
+    in clustering1.txt. Also return the number of edges.
+    '''
+    n = int(1000 * scale)
+    points = random_points(n, seed=seed)
+    nodes1, nodes2 = np.triu_indices(n, 1)
+    lengths = np.sqrt(((points[nodes1] - points[nodes2]) ** 2).sum(axis=1))
+    distances = list(zip(lengths.tolist(),
+                         zip((nodes1 + 1).tolist(), (nodes2 + 1).tolist())))
+    return {'points': points, 'distances': distances, 'n': n}, len(distances)
+
+
+def hamming_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Counter, Int
+
+    Random 24-bit labels, and the number of distinct labels.
+    '''
+    nodes = random_bits(int(50000 * scale), 24, seed)
+    return nodes, len(nodes)
+
+
+def knapsack_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Dictionary, Int
+
+    Random knapsack items, the knapsack size, and the size of the table.
+    '''
+    size = int(50000 * scale)
+    items = random_items(int(200 * scale), size, seed)
+    return {'items': items, 'size': size}, len(items) * (size + 1)
+
+
+def apsp_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: CSRGraph, Int
+
+    A random directed graph with negative edges (but no negative cycle), and
+    the number of node pairs.
+    '''
+    n = int(400 * scale)
+    return random_directed_graph(n, 10 * n, seed), n * n
+
+
+def tsp_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Numpy Array, Int
+
+    Random cities (14 at scale 1, and 1 more each time the scale doubles),
+    and the number of states of the Held-Karp recurrence.
+    '''
+    num_cities = 14 + max(int(round(np.log2(scale))), -10)
+    cities = random_points(num_cities, seed=seed)
+    return cities, 2 ** (num_cities - 1) * (num_cities - 1)
+
+
+def two_sat_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Dictionary, Int
+
+    Random clauses, both as an array and as the forward and reverse graphs of
+    two_sat's read_file. Also return the number of clauses.
+    '''
+    n = int(50000 * scale)
+    clauses = random_clauses(n, n, seed)
+    forward, reverse = defaultdict(list), defaultdict(list)
+    for v1, v2 in clauses.tolist():
+        forward[-v1].append(v2)
+        forward[-v2].append(v1)
+        reverse[v2].append(-v1)
+        reverse[v1].append(-v2)
+    instance = {'n': n, 'clauses': clauses, 'forward': forward,
+                'reverse': reverse}
+    return instance, len(clauses)
+
+
+def scc_setup(scale, seed):
+    '''
+    INPUT: Float, Int
+    OUTPUT: Dictionary, Int
+
+    A random directed graph, both as a CSRGraph and as the forward and reverse
+    graphs of kosaraju_algorithm. Also return the number of edges.
+    '''
+    n = int(50000 * scale)
+    graph = random_directed_graph(n, 5 * n, seed, weighted=False)
+    forward, reverse = defaultdict(list), defaultdict(list)
+    for tail, head in zip(graph.tails().tolist(), graph.targets.tolist()):
+        forward[tail].append(head)
+        reverse[head].append(tail)
+    # Kosaraju's algorithm only visits the nodes it is given.
+    for node in range(n):
+        reverse[node]
+    instance = {'graph': graph, 'forward': forward, 'reverse': reverse}
+    return instance, graph.num_edges
+
+
+# For each problem: a function of the scale and seed returning a random
+# instance and its size (for throughput), and the engines that solve it, by
+# name. Every engine of a problem should return the same answer.
+PROBLEMS = {
+    'jobs_difference': (jobs_setup, {
+        'python': lambda x: jobs.jobs_schedule(x['jobs'], 0),
+        'numpy': lambda x: jobs.jobs_schedule_numpy(x['weights'],
+                                                    x['lengths'], 0),
+    }),
+    'jobs_ratio': (jobs_setup, {
+        'python': lambda x: jobs.jobs_schedule(x['jobs'], 1),
+        'numpy': lambda x: jobs.jobs_schedule_numpy(x['weights'],
+                                                    x['lengths'], 1),
+        'exact': lambda x: jobs.jobs_schedule_numpy(x['weights'],
+                                                    x['lengths'], 1, True),
+    }),
+    'jobs_stream': (jobs_stream_setup, {
+        'treap': lambda x: stream_jobs(x, jobs.ratio_key),
+        'treap_exact': lambda x: stream_jobs(x, jobs.exact_ratio_key),
+        'numpy': lambda x: jobs.jobs_schedule_numpy(x['weights'],
+                                                    x['lengths'], 1, True),
+    }),
+    'mst': (mst_setup, {
+        'prim': lambda x: prim.minimum_spanning_forest(x, 'prim')[0],
+        'kruskal': lambda x: prim.minimum_spanning_forest(x, 'kruskal')[0],
+    }),
+    'k_clustering': (clustering_setup, {
+        'sort': lambda x: clustering.k_clustering(4, x['distances'], x['n']),
+        'heap': lambda x: clustering.k_clustering_heap(4, x['distances'],
+                                                       x['n']),
+        'points': lambda x: clustering.k_clustering_points(4, x['points']),
+    }),
+    'hamming': (hamming_setup, {
+        'pairs': lambda x: hamming.hamming_clustering(x, 24, 3),
+        'masks': lambda x: hamming.hamming_clustering_numpy(x, 24, 3,
+                                                            'masks'),
+        'blocks': lambda x: hamming.hamming_clustering_numpy(x, 24, 3,
+                                                             'blocks'),
+    }),
+    'knapsack': (knapsack_setup, {
+        'python': lambda x: knapsack.knapsack_algorithm(x['items'],
+                                                        x['size']),
+        'numpy': lambda x: knapsack.knapsack_numpy(x['items'], x['size']),
+        'sparse': lambda x: knapsack.knapsack_sparse(x['items'],
+                                                     x['size'])[0],
+        'items': lambda x: knapsack.knapsack_items(x['items'],
+                                                   x['size'])[0],
+        'branch_and_bound': lambda x: knapsack.knapsack_branch_and_bound(
+            x['items'], x['size'])[0],
+        'dispatch': lambda x: knapsack.knapsack_dispatch(x['items'],
+                                                         x['size'])[0],
+    }),
+    'apsp': (apsp_setup, {
+        'floyd_warshall': lambda x: apsp.floyd_warshall(x, x.num_nodes),
+        'blocked': lambda x: apsp.floyd_warshall_blocked(x, x.num_nodes),
+        'min_plus': lambda x: apsp.min_plus_squaring(x, x.num_nodes),
+        'johnson': lambda x: apsp.johnson(x, x.num_nodes),
+        'johnson_parallel': lambda x: apsp.johnson_parallel(x,
+                                                            x.num_nodes)[0],
+    }),
+    'tsp': (tsp_setup, {
+        'original': lambda x: tsp.traveling_salesman(0, x, len(x)),
+        'bitmask': lambda x: tsp.traveling_salesman_bitmask(0, x, len(x)),
+        'layers': lambda x: tsp.traveling_salesman_layers(0, x, len(x)),
+        'parallel': lambda x: tsp.traveling_salesman_parallel(0, x, len(x)),
+        'decomposition': lambda x: tsp_decomposition.tsp_decomposition(
+            x, len(x))[0],
+    }),
+    'two_sat': (two_sat_setup, {
+        'kosaraju': lambda x: two_sat.two_sat(x['n'], x['forward'],
+                                              x['reverse']),
+        'tarjan': lambda x: two_sat.two_sat_assignment(
+            x['n'], x['clauses']) is not None,
+        'preprocess': lambda x: two_sat.two_sat_assignment(
+            x['n'], x['clauses'], True) is not None,
+    }),
+    'scc': (scc_setup, {
+        'kosaraju': lambda x: kosaraju.kosaraju_algorithm(
+            x['forward'], x['reverse'])[1][:5],
+        'tarjan': lambda x: tarjan.tarjan_algorithm(x['graph'])[1][:5],
+    }),
+}
+
+
+def case_names(problems=None):
+    '''
+    INPUT: List
+    OUTPUT: List
+
+    Return the names ('problem/engine') of every case of the given problems
+    (by default, all of them).
+    '''
+    if problems is None:
+        problems = list(PROBLEMS)
+    return ['{}/{}'.format(problem, engine) for problem in problems
+            for engine in PROBLEMS[problem][1]]
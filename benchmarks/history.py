@@ -0,0 +1,89 @@
+import json
+import os
+from statistics import median
+
+
+def load_history(path):
+    '''
+    INPUT: String
+    OUTPUT: List
+
+    Load the runs saved in the JSON history file, oldest first. A missing file
+    is an empty history.
+    '''
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    '''
+    INPUT: String, List
+    OUTPUT: None
+
+    Save the runs to the JSON history file. The file is written to a temporary
+    file first, then renamed into place, so it is never left half-written.
+    '''
+    partial = path + '.partial'
+    with open(partial, 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(partial, path)
+
+
+def find_regressions(history, run, threshold=0.25, window=5,
+                     min_seconds=0.05):
+    '''
+    INPUT: List, Dictionary, Float, Int, Float
+    OUTPUT: List
+
+    Compare each case of the run with the same case in the previous runs of
+    the history at the same scale and seed. The baseline is the median time of
+    the last window runs, which is less noisy than the last run alone. A case
+    regressed if it is more than threshold (as a fraction) slower than its
+    baseline, and by more than min_seconds, below which timings are noise.
+    Return the regressions, as (case, seconds, baseline) tuples.
+    '''
+    regressions = []
+    for name, result in run['results'].items():
+        times = [previous['results'][name]['seconds']
+                 for previous in comparable_runs(history, run, name)]
+        if not times:
+            continue
+        baseline = median(times[-window:])
+        if result['seconds'] > baseline * (1 + threshold) and \
+                result['seconds'] - baseline > min_seconds:
+            regressions.append((name, result['seconds'], baseline))
+    return regressions
+
+
+def find_changed_answers(history, run):
+    '''
+    INPUT: List, Dictionary
+    OUTPUT: List
+
+    Return the cases of the run whose answer differs from the last run of the
+    same case, at the same scale and seed, as (case, answer, previous) tuples.
+    Instances are generated from the seed, so the answers should not change.
+    '''
+    changes = []
+    for name, result in run['results'].items():
+        previous = comparable_runs(history, run, name)
+        if previous:
+            answer = previous[-1]['results'][name]['answer']
+            if answer != result['answer']:
+                changes.append((name, result['answer'], answer))
+    return changes
+
+
+def comparable_runs(history, run, name):
+    '''
+    INPUT: List, Dictionary, String
+    OUTPUT: List
+
+    Return the runs of the history that include the named case, at the same
+    scale and seed as the given run.
+    '''
+    return [previous for previous in history
+            if previous['scale'] == run['scale'] and
+            previous['seed'] == run['seed'] and name in previous['results']]
@@ -0,0 +1,152 @@
+import math
+import multiprocessing
+import os
+import resource
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from benchmarks.cases import PROBLEMS
+from graph_core.weeks import ROOT
+from instrumentation import plain
+from time import time
+
+
+def measure(name, scale, seed):
+    '''
+    INPUT: String, Float, Int
+    OUTPUT: Dictionary
+
+    Generate the instance of the named case ('problem/engine') and solve it,
+    with anything the solver prints discarded. Return its answer, the time it
+    took (in seconds), the size of the instance and the throughput (size per
+    second), and the peak RSS (resident set size) of the process, in MB.
+    '''
+    problem, engine = name.split('/')
+    setup, engines = PROBLEMS[problem]
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        instance, size = setup(scale, seed)
+        time_0 = time()
+        answer = engines[engine](instance)
+        time_1 = time()
+    seconds = time_1 - time_0
+    # On Linux, ru_maxrss is in KB.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+    return {'answer': plain(answer), 'seconds': seconds, 'size': size,
+            'throughput': size / seconds if seconds > 0 else None,
+            'peak_rss_mb': peak}
+
+
+def measure_isolated(name, scale, seed):
+    '''
+    INPUT: String, Float, Int
+    OUTPUT: Dictionary
+
+    Same as measure, but in a fresh process, so that the peak RSS is that of
+    this case alone, and no case can warm up (or leak into) the next. The
+    process is not a daemon, so solvers may start pools of their own.
+    '''
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=measure_into,
+                                      args=(sender, name, scale, seed))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def measure_into(sender, name, scale, seed):
+    '''
+    INPUT: Connection, String, Float, Int
+    OUTPUT: None
+
+    Run measure, and send its result (or the exception it raised) back.
+    '''
+    try:
+        result = measure(name, scale, seed)
+    except Exception as error:
+        result = error
+    sender.send(result)
+    sender.close()
+
+
+def run_suite(names, scale=1.0, seed=0, isolated=True):
+    '''
+    INPUT: List, Float, Int, Boolean
+    OUTPUT: Dictionary
+
+    Measure each of the named cases, printing each result as it is done.
+    Return the run, as it is saved in the history: when and on which commit
+    it ran, at which scale and seed, and the result of each case.
+    '''
+    results = {}
+    for name in names:
+        if isolated:
+            results[name] = measure_isolated(name, scale, seed)
+        else:
+            results[name] = measure(name, scale, seed)
+        print_result(name, results[name])
+    return {'timestamp': datetime.now(timezone.utc).isoformat(),
+            'commit': current_commit(), 'scale': scale, 'seed': seed,
+            'results': results}
+
+
+def print_result(name, result):
+    '''
+    INPUT: String, Dictionary
+    OUTPUT: None
+
+    Print the result of a case, on one line.
+    '''
+    throughput = result['throughput'] or 0
+    print('{:<28}\tTime: {:>8.3f} Seconds\tThroughput: {:>12.0f} / Second\t'
+          'Peak RSS: {:>8.1f} MB\tAnswer: {}'
+          .format(name, result['seconds'], throughput,
+                  result['peak_rss_mb'], result['answer']))
+
+
+def disagreements(results):
+    '''
+    INPUT: Dictionary
+    OUTPUT: List
+
+    Return the problems whose engines did not all return the same answer, in
+    the given results (by case name).
+    '''
+    answers = {}
+    for name, result in results.items():
+        answers.setdefault(name.split('/')[0], []).append(result['answer'])
+    return [problem for problem, values in answers.items()
+            if not all(same_answer(values[0], value) for value in values)]
+
+
+def same_answer(answer1, answer2):
+    '''
+    INPUT: Object, Object
+    OUTPUT: Boolean
+
+    Compare 2 answers, allowing float answers to differ by the rounding of
+    float64 sums taken in different orders (e.g. tour lengths).
+    '''
+    if isinstance(answer1, float) or isinstance(answer2, float):
+        return isinstance(answer1, (int, float)) and \
+            isinstance(answer2, (int, float)) and \
+            math.isclose(answer1, answer2, rel_tol=1e-9)
+    return answer1 == answer2
+
+
+def current_commit():
+    '''
+    INPUT: None
+    OUTPUT: None or String
+
+    Return the hash of the repository's current commit, if git is available.
+    '''
+    try:
+        output = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
@@ -0,0 +1,14 @@
+from graph_core.csr import CSRGraph
+from graph_core.generators import (random_bits, random_clauses,
+                                   random_directed_graph, random_items,
+                                   random_jobs, random_points,
+                                   random_undirected_graph)
+from graph_core.indexed_heap import IndexedHeap
+from graph_core.loader import read_clauses, read_edges
+from graph_core.union_find import UnionFind
+from graph_core.weeks import WEEKS, week_module
+
+__all__ = ['CSRGraph', 'IndexedHeap', 'UnionFind', 'WEEKS', 'random_bits',
+           'random_clauses', 'random_directed_graph', 'random_items',
+           'random_jobs', 'random_points', 'random_undirected_graph',
+           'read_clauses', 'read_edges', 'week_module']
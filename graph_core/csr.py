@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class CSRGraph(object):
+    '''
+    Directed graph over the nodes 0 to n - 1, in compressed sparse row form.
+    The edges leaving node u are those with indices offsets[u] to
+    offsets[u + 1], and their heads (and weights, if any) are stored in the
+    targets (and weights) arrays. Offsets and targets are int32 (or int64 for
+    graphs with 2 ** 31 edges or more); weights are int64 or float64.
+    '''
+
+    def __init__(self, offsets, targets, weights=None):
+        '''
+        INPUT: Numpy Array, Numpy Array, Numpy Array
+        OUTPUT: None
+        '''
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, tails, heads, weights=None, num_nodes=None):
+        '''
+        INPUT: Numpy Array, Numpy Array, Numpy Array, Int
+        OUTPUT: CSRGraph
+
+        Build the graph from arrays of (0-indexed) edge tails and heads, and
+        optionally weights. By default, the number of nodes is one more than
+        the largest node found. Edges leaving the same node keep their order.
+        '''
+        tails, heads = np.asarray(tails), np.asarray(heads)
+        if num_nodes is None:
+            num_nodes = int(max(tails.max(initial=-1),
+                                heads.max(initial=-1))) + 1
+        dtype = np.int32 if len(tails) < 2 ** 31 else np.int64
+        order = np.argsort(tails, kind='stable')
+        offsets = np.zeros(num_nodes + 1, dtype=dtype)
+        np.cumsum(np.bincount(tails, minlength=num_nodes), out=offsets[1:])
+        targets = heads[order].astype(dtype)
+        if weights is not None:
+            weights = np.asarray(weights)[order]
+        return cls(offsets, targets, weights)
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def tails(self):
+        '''
+        INPUT: None
+        OUTPUT: Numpy Array
+
+        Return the tail of each edge, in the same order as the targets array.
+        '''
+        return np.repeat(np.arange(self.num_nodes, dtype=self.targets.dtype),
+                         np.diff(self.offsets))
+
+    def neighbors(self, node):
+        '''
+        INPUT: Int
+        OUTPUT: Numpy Array
+
+        Return the heads of the edges leaving the given node.
+        '''
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def reverse(self):
+        '''
+        INPUT: None
+        OUTPUT: CSRGraph
+
+        Return the graph with the direction of every edge reversed.
+        '''
+        return CSRGraph.from_edges(self.targets, self.tails(), self.weights,
+                                   self.num_nodes)
+
+    def undirected(self):
+        '''
+        INPUT: None
+        OUTPUT: CSRGraph
+
+        Return the graph with every edge in both directions, as is needed to
+        represent an undirected graph.
+        '''
+        tails, heads = self.tails(), self.targets
+        weights = self.weights
+        if weights is not None:
+            weights = np.concatenate((weights, weights))
+        return CSRGraph.from_edges(np.concatenate((tails, heads)),
+                                   np.concatenate((heads, tails)),
+                                   weights, self.num_nodes)
@@ -0,0 +1,121 @@
+import numpy as np
+from collections import Counter
+from graph_core.csr import CSRGraph
+
+
+def random_jobs(num_jobs, seed=0, max_weight=100, max_length=100):
+    '''
+    INPUT: Int, Int, Int, Int
+    OUTPUT: Numpy Array, Numpy Array
+
+    Generate random jobs, as in jobs.txt: weights and lengths drawn uniformly
+    from 1 to max_weight and max_length. Return them as int64 arrays.
+    '''
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, max_weight + 1, num_jobs, dtype=np.int64)
+    lengths = rng.integers(1, max_length + 1, num_jobs, dtype=np.int64)
+    return weights, lengths
+
+
+def random_undirected_graph(num_nodes, num_edges, seed=0, max_weight=10000):
+    '''
+    INPUT: Int, Int, Int, Int
+    OUTPUT: CSRGraph
+
+    Generate a random connected, undirected graph, as in edges.txt: a random
+    spanning tree (each node joined to a random earlier node), plus random
+    extra edges, up to num_edges in all. Weights are drawn uniformly from
+    -max_weight to max_weight. Every edge is stored in both directions.
+    '''
+    rng = np.random.default_rng(seed)
+    nodes = np.arange(1, num_nodes)
+    tree_tails = nodes
+    tree_heads = (rng.random(num_nodes - 1) * nodes).astype(np.int64)
+    num_extra = max(num_edges - (num_nodes - 1), 0)
+    extra_tails = rng.integers(0, num_nodes, num_extra)
+    extra_heads = rng.integers(0, num_nodes, num_extra)
+    loops = extra_tails == extra_heads
+    tails = np.concatenate((tree_tails, extra_tails[~loops]))
+    heads = np.concatenate((tree_heads, extra_heads[~loops]))
+    weights = rng.integers(-max_weight, max_weight + 1, len(tails))
+    graph = CSRGraph.from_edges(tails, heads, weights, num_nodes)
+    return graph.undirected()
+
+
+def random_directed_graph(num_nodes, num_edges, seed=0, weighted=True,
+                          max_weight=100):
+    '''
+    INPUT: Int, Int, Int, Boolean, Int
+    OUTPUT: CSRGraph
+
+    Generate a random directed graph, without self-loops. If weighted, give
+    each edge (u, v) the weight c + p[u] - p[v], for a cost c drawn from 1 to
+    max_weight and a random potential p of each node, as in g1.txt to g3.txt.
+    Many of the weights are then negative, but every cycle costs the sum of
+    its (positive) c, so there is never a negative cycle.
+    '''
+    rng = np.random.default_rng(seed)
+    tails = rng.integers(0, num_nodes, num_edges)
+    heads = rng.integers(0, num_nodes, num_edges)
+    tails, heads = tails[tails != heads], heads[tails != heads]
+    weights = None
+    if weighted:
+        potentials = rng.integers(0, 2 * max_weight, num_nodes)
+        costs = rng.integers(1, max_weight + 1, len(tails))
+        weights = costs + potentials[tails] - potentials[heads]
+    return CSRGraph.from_edges(tails, heads, weights, num_nodes)
+
+
+def random_clauses(num_variables, num_clauses, seed=0):
+    '''
+    INPUT: Int, Int, Int
+    OUTPUT: Numpy Array
+
+    Generate random 2SAT clauses, as in 2sat1.txt: an (m x 2) array of
+    signed, 1-indexed literals, each negated with probability 1/2.
+    '''
+    rng = np.random.default_rng(seed)
+    variables = rng.integers(1, num_variables + 1, (num_clauses, 2))
+    signs = rng.choice(np.array([-1, 1]), (num_clauses, 2))
+    return variables * signs
+
+
+def random_points(num_points, dimensions=2, seed=0, max_coordinate=10000):
+    '''
+    INPUT: Int, Int, Int, Int
+    OUTPUT: Numpy Array
+
+    Generate a cloud of random points (one per row), with coordinates drawn
+    uniformly from 0 to max_coordinate, as in tsp.txt.
+    '''
+    rng = np.random.default_rng(seed)
+    return rng.random((num_points, dimensions)) * max_coordinate
+
+
+def random_bits(num_nodes, num_bits=24, seed=0):
+    '''
+    INPUT: Int, Int, Int
+    OUTPUT: Counter
+
+    Generate random labels of num_bits bits, as in clustering_big.txt. Return
+    a Counter of the labels (as base-10 ints), like hamming_clustering's
+    read_file.
+    '''
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 2 ** num_bits, num_nodes, dtype=np.int64)
+    return Counter(labels.tolist())
+
+
+def random_items(num_items, size, seed=0, max_value=100000):
+    '''
+    INPUT: Int, Int, Int, Int
+    OUTPUT: List
+
+    Generate random knapsack items, as in knapsack1.txt: values drawn from 1
+    to max_value, and weights from 1 to a tenth of the knapsack size. Return
+    them as a list of (value, weight) tuples.
+    '''
+    rng = np.random.default_rng(seed)
+    values = rng.integers(1, max_value + 1, num_items)
+    weights = rng.integers(1, max(size // 10, 1) + 1, num_items)
+    return list(zip(values.tolist(), weights.tolist()))
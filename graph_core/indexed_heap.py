@@ -0,0 +1,105 @@
+class IndexedHeap(object):
+    '''
+    Binary min-heap of the integers 0 to n - 1, each with a key, which also
+    keeps the position of each integer in the heap. So the key of an integer
+    already in the heap can be decreased in O(log n) time, rather than pushing
+    a duplicate (stale) entry, and the heap never holds more than n entries.
+    '''
+
+    def __init__(self, n):
+        '''
+        INPUT: Int
+        OUTPUT: None
+        '''
+        self.heap = []
+        self.keys = [None] * n
+        # Position of each integer in the heap, or -1 if it is not in it.
+        self.positions = [-1] * n
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return self.positions[item] >= 0
+
+    def push(self, item, key):
+        '''
+        INPUT: Int, Number
+        OUTPUT: None
+
+        Add the item with the given key or, if the item is already in the heap
+        with a larger key, decrease its key to the given one.
+        '''
+        position = self.positions[item]
+        if position < 0:
+            position = len(self.heap)
+            self.heap.append(item)
+            self.positions[item] = position
+        elif key >= self.keys[item]:
+            return
+        self.keys[item] = key
+        self.sift_up(position)
+
+    def pop(self):
+        '''
+        INPUT: None
+        OUTPUT: Int, Number
+
+        Remove and return the item with the smallest key, and its key.
+        '''
+        heap, positions = self.heap, self.positions
+        item = heap[0]
+        last = heap.pop()
+        positions[item] = -1
+        if heap:
+            heap[0] = last
+            positions[last] = 0
+            self.sift_down(0)
+        return item, self.keys[item]
+
+    def sift_up(self, position):
+        '''
+        INPUT: Int
+        OUTPUT: None
+
+        Move the item at the given position up, while its key is smaller than
+        its parent's key.
+        '''
+        heap, keys, positions = self.heap, self.keys, self.positions
+        item = heap[position]
+        key = keys[item]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if keys[heap[parent]] <= key:
+                break
+            heap[position] = heap[parent]
+            positions[heap[position]] = position
+            position = parent
+        heap[position] = item
+        positions[item] = position
+
+    def sift_down(self, position):
+        '''
+        INPUT: Int
+        OUTPUT: None
+
+        Move the item at the given position down, while its key is larger than
+        the key of its smallest child.
+        '''
+        heap, keys, positions = self.heap, self.keys, self.positions
+        item = heap[position]
+        key = keys[item]
+        size = len(heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[heap[child + 1]] < keys[heap[child]]:
+                child += 1
+            if keys[heap[child]] >= key:
+                break
+            heap[position] = heap[child]
+            positions[heap[position]] = position
+            position = child
+        heap[position] = item
+        positions[item] = position
@@ -0,0 +1,110 @@
+import numpy as np
+import os
+from graph_core.csr import CSRGraph
+
+
+def read_edges(filename, header=True, weighted=True, cache=False):
+    '''
+    INPUT: String, Boolean, Boolean, Boolean
+    OUTPUT: CSRGraph
+
+    Read a file of (1-indexed) directed edges, one per line, given by its tail,
+    its head and, if weighted, its weight. If there is a header, its first line
+    starts with the number of nodes (e.g. edges.txt and g1.txt); otherwise
+    (e.g. SCC.txt), the number of nodes is the largest node found. The whole
+    file is parsed at once by np.loadtxt, rather than line by line. Weights are
+    kept as int64 if they are all integers, and as float64 otherwise.
+
+    If cache is True, the parsed graph is saved next to the file, with a .npz
+    extension, and is loaded from there instead while it is newer than the
+    file. Return the graph, with 0-indexed nodes.
+    '''
+    cached = load_cache(filename, cache)
+    if cached is not None and (not weighted or 'weights' in cached):
+        return CSRGraph(cached['offsets'], cached['targets'],
+                        cached['weights'] if weighted else None)
+    num_nodes = None
+    with open(filename) as f:
+        if header:
+            num_nodes = int(f.readline().split()[0])
+        columns = 3 if weighted else 2
+        data = np.loadtxt(f, dtype=np.float64 if weighted else np.int64,
+                          usecols=range(columns), ndmin=2)
+    tails = data[:, 0].astype(np.int64) - 1
+    heads = data[:, 1].astype(np.int64) - 1
+    weights = None
+    if weighted:
+        weights = data[:, 2]
+        if np.array_equal(weights, np.round(weights)):
+            weights = weights.astype(np.int64)
+    graph = CSRGraph.from_edges(tails, heads, weights, num_nodes)
+    if cache:
+        arrays = {'offsets': graph.offsets, 'targets': graph.targets}
+        if weighted:
+            arrays['weights'] = graph.weights
+        save_cache(filename, arrays)
+    return graph
+
+
+def read_clauses(filename, cache=False):
+    '''
+    INPUT: String, Boolean
+    OUTPUT: Int, Numpy Array
+
+    Read a 2SAT file: the first line contains the number of variables, and each
+    subsequent line a clause of 2 (signed, 1-indexed) literals, with '-'
+    denoting logical "not". The file is parsed at once by np.loadtxt, and may
+    be cached as for read_edges. Return the number of variables and an
+    (m x 2) array of the clauses.
+    '''
+    cached = load_cache(filename, cache)
+    if cached is not None:
+        return int(cached['n']), cached['clauses']
+    with open(filename) as f:
+        n = int(f.readline())
+        clauses = np.loadtxt(f, dtype=np.int64, ndmin=2)
+    if cache:
+        save_cache(filename, {'n': np.array(n), 'clauses': clauses})
+    return n, clauses
+
+
+def cache_path(filename):
+    '''
+    INPUT: String
+    OUTPUT: String
+
+    Return the path of the binary cache of the given file.
+    '''
+    return os.path.splitext(filename)[0] + '.npz'
+
+
+def load_cache(filename, cache):
+    '''
+    INPUT: String, Boolean
+    OUTPUT: None or Dictionary
+
+    If caching, return the arrays cached for the given file, by name, unless
+    there are none, or they are older than the file. Otherwise, return 'None'.
+    The arrays are read in full, so the cache file is closed on return.
+    '''
+    path = cache_path(filename)
+    if not cache or not os.path.exists(path) or \
+            os.path.getmtime(path) < os.path.getmtime(filename):
+        return None
+    with np.load(path) as cached:
+        return {name: cached[name] for name in cached.files}
+
+
+def save_cache(filename, arrays):
+    '''
+    INPUT: String, Dictionary
+    OUTPUT: None
+
+    Save the given arrays, by name, as the binary cache of the given file. The
+    cache is written to a temporary file first, then renamed into place, so a
+    reader never sees a partial cache.
+    '''
+    path = cache_path(filename)
+    partial = path + '.partial.npz'
+    np.savez(partial, **arrays)
+    os.replace(partial, path)
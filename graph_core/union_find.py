@@ -0,0 +1,84 @@
+from array import array
+
+
+class UnionFind(object):
+    '''
+    Disjoint-set forest over the integers 0 to n - 1, backed by 2 compact
+    integer arrays (the parent and the subtree size of each element) rather
+    than by dictionaries. Finds use path halving, and unions attach the root
+    of the smaller tree to the root of the larger one, so both take nearly
+    constant amortized time. The number of components is kept up to date.
+    '''
+
+    def __init__(self, n):
+        '''
+        INPUT: Int
+        OUTPUT: None
+
+        Start with each of the n elements in a component of its own.
+        '''
+        self.parents = array('i', range(n))
+        self.sizes = array('i', [1]) * n
+        self.components = n
+
+    def find(self, x):
+        '''
+        INPUT: Int
+        OUTPUT: Int
+
+        Return the root of the component of x. Along the way, point every other
+        element on the path to its grandparent, which halves the path length.
+        '''
+        parents = self.parents
+        while parents[x] != x:
+            parents[x] = parents[parents[x]]
+            x = parents[x]
+        return x
+
+    def union(self, x, y):
+        '''
+        INPUT: Int, Int
+        OUTPUT: Boolean
+
+        Merge the components of x and y. Return False if they were already in
+        the same component, and True otherwise.
+        '''
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self.sizes[x] < self.sizes[y]:
+            x, y = y, x
+        self.parents[y] = x
+        self.sizes[x] += self.sizes[y]
+        self.components -= 1
+        return True
+
+    def union_many(self, pairs):
+        '''
+        INPUT: Iterable
+        OUTPUT: Int
+
+        Merge the components of each pair of elements, in order. Return the
+        number of pairs that merged 2 different components.
+        '''
+        find, parents, sizes = self.find, self.parents, self.sizes
+        merged = 0
+        for x, y in pairs:
+            x, y = find(x), find(y)
+            if x != y:
+                if sizes[x] < sizes[y]:
+                    x, y = y, x
+                parents[y] = x
+                sizes[x] += sizes[y]
+                merged += 1
+        self.components -= merged
+        return merged
+
+    def connected(self, x, y):
+        '''
+        INPUT: Int, Int
+        OUTPUT: Boolean
+
+        Return True if x and y are in the same component.
+        '''
+        return self.find(x) == self.find(y)
@@ -0,0 +1,23 @@
+import importlib
+import os
+import sys
+
+# The top of the repository, and each week's directory. The weeks' scripts are
+# top-level modules (not packages) that import their siblings by name.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEEKS = [os.path.join(ROOT, 'Week {}'.format(week)) for week in range(1, 7)]
+
+
+def week_module(name):
+    '''
+    INPUT: String
+    OUTPUT: Module
+
+    Import one of the weeks' scripts (e.g. 'two_sat') as a module, for the
+    benchmarks and the batch driver. The weeks' directories are added to the
+    module search path (once), so that the script can import its siblings.
+    '''
+    for directory in WEEKS:
+        if directory not in sys.path:
+            sys.path.append(directory)
+    return importlib.import_module(name)
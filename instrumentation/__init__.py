@@ -0,0 +1,7 @@
+from instrumentation.adapters import (ConsoleLog, JSONLinesSink,
+                                      PhaseProfiler, ProgressBar)
+from instrumentation.observer import Observer, ObserverGroup
+from instrumentation.serialize import plain
+
+__all__ = ['ConsoleLog', 'JSONLinesSink', 'Observer', 'ObserverGroup',
+           'PhaseProfiler', 'ProgressBar', 'plain']
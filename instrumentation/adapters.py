@@ -0,0 +1,222 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import tracemalloc
+from instrumentation.observer import Observer
+from time import time
+
+
+class ConsoleLog(Observer):
+    '''
+    Observer that prints how long each phase took, every given number of
+    progress events, and every message, in the same register as the solvers'
+    old prints (e.g. 'layer (m=12):    3.2 Seconds').
+    '''
+
+    def __init__(self, every=100, stream=None):
+        '''
+        INPUT: Int, File
+        OUTPUT: None
+        '''
+        self.every = every
+        self.stream = stream
+        self.starts = []
+
+    def phase_start(self, phase, **fields):
+        self.starts.append(time())
+
+    def phase_end(self, phase, **fields):
+        seconds = time() - self.starts.pop()
+        print('{}{}:\t{:>6.1f} Seconds'.format(phase, describe(fields),
+                                               seconds), file=self.stream)
+
+    def progress(self, phase, done, total=None, **fields):
+        if done and not done % self.every:
+            print('{} {:>6}'.format(phase.title(), done), file=self.stream)
+
+    def message(self, phase, text, **fields):
+        print(text, file=self.stream)
+
+
+class ProgressBar(Observer):
+    '''
+    Observer that draws a progress bar for the current phase, redrawn in
+    place, at most once every min_interval seconds (and once at the end), so
+    that frequent progress events do not slow the solver down.
+    '''
+
+    def __init__(self, min_interval=0.2, width=30, stream=None):
+        '''
+        INPUT: Float, Int, File
+        OUTPUT: None
+        '''
+        self.min_interval = min_interval
+        self.width = width
+        self.stream = stream if stream is not None else sys.stderr
+        self.start = self.last = 0.0
+        self.drawn = False
+
+    def phase_start(self, phase, **fields):
+        self.start = time()
+        self.last = 0.0
+
+    def phase_end(self, phase, **fields):
+        if self.drawn:
+            self.stream.write('\n')
+            self.stream.flush()
+            self.drawn = False
+
+    def progress(self, phase, done, total=None, **fields):
+        now = time()
+        if now - self.last < self.min_interval and done != total:
+            return
+        self.last = now
+        rate = done / max(now - self.start, 1e-9)
+        if total:
+            filled = int(self.width * done / total)
+            bar = '[{}{}] {:>6.1%}'.format('#' * filled,
+                                           '.' * (self.width - filled),
+                                           done / total)
+        else:
+            bar = ''
+        self.stream.write('\r{} {} {}/{} ({:.0f} / Second)'
+                          .format(phase, bar, done, total or '?', rate))
+        self.stream.flush()
+        self.drawn = True
+
+
+class PhaseProfiler(Observer):
+    '''
+    Observer that profiles the named phases (by default, all of them) with
+    cProfile, and records the peak memory allocated during each with
+    tracemalloc. Phases that repeat (e.g. one per layer) are sampled: only one
+    in every given number is profiled. The profiles of each phase are
+    accumulated under its name. Nested phases are not profiled separately, as
+    only one profiler can be active at a time.
+    '''
+
+    def __init__(self, phases=None, every=1, profile=True, memory=True):
+        '''
+        INPUT: List, Int, Boolean, Boolean
+        OUTPUT: None
+        '''
+        self.phases = set(phases) if phases is not None else None
+        self.every = every
+        self.profile = profile
+        self.memory = memory
+        self.counts = {}
+        self.profiles = {}
+        # Peak memory (in bytes) allocated during each phase, at most.
+        self.peaks = {}
+        self.active = None
+        self.tracing = False
+
+    def phase_start(self, phase, **fields):
+        if self.active is not None or \
+                (self.phases is not None and phase not in self.phases):
+            return
+        count = self.counts.get(phase, 0)
+        self.counts[phase] = count + 1
+        if count % self.every:
+            return
+        self.active = phase
+        if self.memory:
+            self.tracing = not tracemalloc.is_tracing()
+            if self.tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.profile:
+            self.profiles.setdefault(phase, cProfile.Profile()).enable()
+
+    def phase_end(self, phase, **fields):
+        if phase != self.active:
+            return
+        if self.profile:
+            self.profiles[phase].disable()
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peaks[phase] = max(self.peaks.get(phase, 0), peak)
+            if self.tracing:
+                tracemalloc.stop()
+        self.active = None
+
+    def report(self, limit=10):
+        '''
+        INPUT: Int
+        OUTPUT: String
+
+        Return, for each profiled phase, its peak memory and the functions
+        that took the most cumulative time.
+        '''
+        lines = []
+        for phase in self.counts:
+            if phase in self.peaks:
+                lines.append('{} - Peak Memory:\t{:.1f} MB'
+                             .format(phase, self.peaks[phase] / 2 ** 20))
+            if phase in self.profiles:
+                output = io.StringIO()
+                stats = pstats.Stats(self.profiles[phase], stream=output)
+                stats.sort_stats('cumulative').print_stats(limit)
+                lines.append(output.getvalue())
+        return '\n'.join(lines)
+
+
+class JSONLinesSink(Observer):
+    '''
+    Observer that writes every event to a file, as one JSON object per line,
+    with its time, type ('phase_start', 'phase_end', 'progress' or 'message'),
+    phase and fields, for later analysis.
+    '''
+
+    def __init__(self, f):
+        '''
+        INPUT: File or String
+        OUTPUT: None
+
+        Write to the given file, or append to the file at the given path.
+        '''
+        self.f = open(f, 'a') if isinstance(f, str) else f
+
+    def write(self, event, phase, fields):
+        '''
+        INPUT: String, String, Dictionary
+        OUTPUT: None
+
+        Write one event, as a line of JSON.
+        '''
+        record = {'time': time(), 'event': event, 'phase': phase}
+        record.update(fields)
+        self.f.write(json.dumps(record, default=float) + '\n')
+
+    def phase_start(self, phase, **fields):
+        self.write('phase_start', phase, fields)
+
+    def phase_end(self, phase, **fields):
+        self.write('phase_end', phase, fields)
+        self.f.flush()
+
+    def progress(self, phase, done, total=None, **fields):
+        fields.update(done=done, total=total)
+        self.write('progress', phase, fields)
+
+    def message(self, phase, text, **fields):
+        fields.update(text=text)
+        self.write('message', phase, fields)
+
+    def close(self):
+        self.f.close()
+
+
+def describe(fields):
+    '''
+    INPUT: Dictionary
+    OUTPUT: String
+
+    Format the fields of an event for printing, e.g. ' (m=12, bytes=1024)'.
+    '''
+    if not fields:
+        return ''
+    return ' ({})'.format(', '.join('{}={}'.format(name, value)
+                                    for name, value in fields.items()))
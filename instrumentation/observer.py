@@ -0,0 +1,76 @@
+class Observer(object):
+    '''
+    Receiver of a solver's structured events. Solvers take an optional
+    observer (None by default) and only build events when one is given, so
+    instrumentation costs a single comparison when it is disabled. There are 4
+    events, each with the name of a phase (e.g. 'knapsack' or 'layer') and any
+    number of named fields, such as:
+      - done and total: the number of items (or nodes, etc.) processed so far,
+        out of the total, for progress events.
+      - states: the number of DP states (or table cells) touched so far.
+      - bytes: the number of bytes allocated for the phase.
+    Every method does nothing here; adapters override the ones they need.
+    '''
+
+    def phase_start(self, phase, **fields):
+        '''
+        INPUT: String, Dictionary
+        OUTPUT: None
+
+        A phase of the solver has started.
+        '''
+
+    def phase_end(self, phase, **fields):
+        '''
+        INPUT: String, Dictionary
+        OUTPUT: None
+
+        The last phase of that name to start has ended.
+        '''
+
+    def progress(self, phase, done, total=None, **fields):
+        '''
+        INPUT: String, Int, Int, Dictionary
+        OUTPUT: None
+
+        The current phase has processed done (out of total) items.
+        '''
+
+    def message(self, phase, text, **fields):
+        '''
+        INPUT: String, String, Dictionary
+        OUTPUT: None
+
+        The solver reports something that is neither a phase nor progress, as
+        a line of text (e.g. that it resumed from a saved layer).
+        '''
+
+
+class ObserverGroup(Observer):
+    '''
+    Observer that passes every event on to each of several observers, in
+    order (e.g. a progress bar and a JSON-lines sink at once).
+    '''
+
+    def __init__(self, *observers):
+        '''
+        INPUT: Observers
+        OUTPUT: None
+        '''
+        self.observers = observers
+
+    def phase_start(self, phase, **fields):
+        for observer in self.observers:
+            observer.phase_start(phase, **fields)
+
+    def phase_end(self, phase, **fields):
+        for observer in self.observers:
+            observer.phase_end(phase, **fields)
+
+    def progress(self, phase, done, total=None, **fields):
+        for observer in self.observers:
+            observer.progress(phase, done, total, **fields)
+
+    def message(self, phase, text, **fields):
+        for observer in self.observers:
+            observer.message(phase, text, **fields)
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def plain(answer):
+    '''
+    INPUT: Object
+    OUTPUT: Object
+
+    Convert an answer (e.g. a NumPy scalar, or a tuple or dictionary of them)
+    to plain Python types, so that it can be saved as JSON and compared with
+    saved answers.
+    '''
+    if isinstance(answer, np.generic):
+        return answer.item()
+    if isinstance(answer, (list, tuple)):
+        return [plain(value) for value in answer]
+    if isinstance(answer, dict):
+        return {key: plain(value) for key, value in answer.items()}
+    return answer